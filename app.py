@@ -4,13 +4,12 @@
 性格診断とジャーナリングを通じて、自己理解を深めるためのアプリケーションです。
 """
 
+from typing import Callable, Final
+
 import streamlit as st
 
 from logic.auth_manager import AuthManager
 from database.db_manager import init_database
-from ui.diagnostic_ui import render_diagnostic_page
-from ui.journal_ui import render_journal_page
-from ui.analysis_ui import render_analysis_page
 from ui.styles import inject_custom_css, get_hero_card, get_feature_card
 
 
@@ -26,47 +25,89 @@ st.set_page_config(
 inject_custom_css()
 
 
+@st.cache_resource
+def _get_auth_manager() -> AuthManager:
+    """AuthManagerをプロセス全体で1つだけ生成して共有する"""
+    return AuthManager()
+
+
+@st.cache_resource
+def _ensure_db() -> bool:
+    """データベースの初期化をプロセスごとに1回だけ行う"""
+    init_database()
+    return True
+
+
+def _session_auth_url() -> str | None:
+    """
+    認証URLをセッションごとに1回だけ生成して再実行で使い回す
+
+    get_auth_url() はCSRF対策の state をセッション状態に保存するため、
+    ユーザー間で共有されるキャッシュには載せない
+    """
+    if "auth_url" not in st.session_state:
+        st.session_state.auth_url = _get_auth_manager().get_auth_url()
+    return st.session_state.auth_url
+
+
 def init_app() -> None:
     """アプリケーションの初期化"""
     # データベースを初期化
     try:
-        init_database()
+        _ensure_db()
     except ConnectionError as e:
         st.error(f"⚠️ データベース接続エラー: {e}")
         st.warning("管理者に連絡するか、Secretsの設定（DATABASE_URL）を確認してください。")
         st.info("このエラーが発生している間、データの保存・読み込みはできません。")
         st.stop()  # アプリを停止
 
-    # セッション状態の初期化
-    if "user_id" not in st.session_state:
-        # デフォルトはゲスト（ログイン前）
-        st.session_state.user_id = None
-    if "current_view" not in st.session_state:
-        st.session_state.current_view = "diagnostic"
-    if "user_info" not in st.session_state:
-        st.session_state.user_info = None
+    # セッション状態の初期化（デフォルトはゲスト＝ログイン前）
+    st.session_state.setdefault("user_id", None)
+    st.session_state.setdefault("current_view", "diagnostic")
+    st.session_state.setdefault("user_info", None)
+
+    # ログアウト直後はログインCookieを削除し、同じセッション中は復元しない
+    if st.session_state.pop("clear_session_cookie", False):
+        _get_auth_manager().clear_session()
+        st.session_state.session_cookie_revoked = True
+
+    # ページ再読み込みなどでセッション状態が失われた場合は、署名付きCookieからログイン状態を復元する
+    if (
+        st.session_state.user_id is None
+        and "code" not in st.query_params
+        and not st.session_state.get("session_cookie_revoked")
+    ):
+        auth_manager = _get_auth_manager()
+        if auth_manager.is_configured():
+            user_info = auth_manager.restore_session()
+            if user_info:
+                st.session_state.user_info = user_info
+                st.session_state.user_id = user_info["email"]
 
     # URLパラメータから認証コードを取得 (Callback)
-    query_params = st.query_params
-    if "code" in query_params:
-        auth_manager = AuthManager()
+    # ログイン済みのセッションでは query_params を参照しない
+    if st.session_state.user_id is None and "code" in st.query_params:
+        auth_manager = _get_auth_manager()
         if auth_manager.is_configured():
             try:
-                code = query_params["code"]
+                code = st.query_params["code"]
                 credentials = auth_manager.get_token_from_code(code)
                 user_info = auth_manager.get_user_info(credentials)
                 
                 if user_info:
                     st.session_state.user_info = user_info
                     st.session_state.user_id = user_info.get("email") # EmailをユーザーIDとして使用
+                    st.session_state.session_cookie_revoked = False
+                    auth_manager.persist_session(user_info)
                     st.success(f"ログインしました: {user_info.get('name')}")
                     # コード付きURLからクリーンなURLへリダイレクトしたほうが良いが、
                     # Streamlitでは rerun でパラメータが残る場合があるため、一旦このまま
             except Exception as e:
                 st.error(f"認証エラー: {e}")
             finally:
-                # パラメータをクリア
-                st.query_params.clear()
+                # 認証で使ったパラメータだけを取り除く（他のパラメータは残す）
+                for key in ("code", "state", "scope"):
+                    st.query_params.pop(key, None)
 
 
 def render_login_page(auth_manager: AuthManager) -> None:
@@ -102,7 +143,7 @@ def render_login_page(auth_manager: AuthManager) -> None:
     st.markdown("<br>", unsafe_allow_html=True)
     
     # ログインボタン
-    auth_url = auth_manager.get_auth_url()
+    auth_url = _session_auth_url()
     if auth_url:
         col_btn = st.columns([1, 2, 1])
         with col_btn[1]:
@@ -118,61 +159,145 @@ def render_login_page(auth_manager: AuthManager) -> None:
 
 
 
+# サイドバーのHTML（Markdown解析を通さず st.html でそのまま描画する）
+
+# ロゴ/タイトル
+_SIDEBAR_LOGO_HTML: Final[str] = """
+<div style="
+    text-align: center;
+    padding: 1rem 0;
+    margin-bottom: 1rem;
+">
+    <div style="font-size: 2.5rem; margin-bottom: 0.5rem;">🔮</div>
+    <div style="
+        font-size: 1.25rem;
+        font-weight: 700;
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        -webkit-background-clip: text;
+        -webkit-text-fill-color: transparent;
+    ">自己分析アプリ</div>
+</div>
+"""
+
+# ユーザー情報カード（{user_name} を差し込む）
+_USER_CARD_TEMPLATE: Final[str] = """
+<div style="
+    background: rgba(255, 255, 255, 0.05);
+    border: 1px solid rgba(255, 255, 255, 0.1);
+    border-radius: 12px;
+    padding: 0.75rem 1rem;
+    margin-bottom: 1rem;
+    display: flex;
+    align-items: center;
+    gap: 0.75rem;
+">
+    <div style="
+        width: 36px;
+        height: 36px;
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        border-radius: 50%;
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        font-size: 1rem;
+    ">👤</div>
+    <div>
+        <div style="font-size: 0.75rem; color: #718096;">ログイン中</div>
+        <div style="font-size: 0.9rem; color: #e2e8f0; font-weight: 500;">{user_name}</div>
+    </div>
+</div>
+"""
+
+# アプリ情報（コンパクト版）
+_FOOTER_HTML: Final[str] = """
+<div style="
+    font-size: 0.8rem;
+    color: #718096;
+    text-align: center;
+    padding: 0.5rem;
+">
+    <div style="margin-bottom: 0.5rem;">💡 機能一覧</div>
+    <div style="display: flex; flex-wrap: wrap; gap: 0.25rem; justify-content: center;">
+        <span style="
+            background: rgba(255,255,255,0.05);
+            padding: 0.25rem 0.5rem;
+            border-radius: 6px;
+            font-size: 0.7rem;
+        ">性格診断</span>
+        <span style="
+            background: rgba(255,255,255,0.05);
+            padding: 0.25rem 0.5rem;
+            border-radius: 6px;
+            font-size: 0.7rem;
+        ">ジャーナル</span>
+        <span style="
+            background: rgba(255,255,255,0.05);
+            padding: 0.25rem 0.5rem;
+            border-radius: 6px;
+            font-size: 0.7rem;
+        ">AI分析</span>
+    </div>
+</div>
+"""
+
+
+# ナビゲーション項目（ビューID, アイコン, ラベル）
+_NAV_ITEMS: Final[tuple[tuple[str, str, str], ...]] = (
+    ("diagnostic", "🔮", "性格診断"),
+    ("journal", "📝", "ジャーナル"),
+    ("analysis", "🔍", "分析"),
+)
+_NAV_OPTIONS: Final[tuple[str, ...]] = tuple(view_id for view_id, _, _ in _NAV_ITEMS)
+_VIEW_NAMES: Final[dict[str, str]] = {
+    view_id: f"{icon} {label}" for view_id, icon, label in _NAV_ITEMS
+}
+
+
+# 各画面のモジュールは選択されたときに初めてインポートする
+# （2回目以降は sys.modules から取得されるため追加コストはない）
+def _render_diagnostic() -> None:
+    from ui.diagnostic_ui import render_diagnostic_page
+    render_diagnostic_page()
+
+
+def _render_journal() -> None:
+    from ui.journal_ui import render_journal_page
+    render_journal_page()
+
+
+def _render_analysis() -> None:
+    from ui.analysis_ui import render_analysis_page
+    render_analysis_page()
+
+
+# ビューIDと描画関数の対応表
+_VIEW_RENDERERS: Final[dict[str, Callable[[], None]]] = {
+    "diagnostic": _render_diagnostic,
+    "journal": _render_journal,
+    "analysis": _render_analysis,
+}
+
+
+def _on_nav_change() -> None:
+    """ナビゲーションの選択を現在のビューに反映する"""
+    st.session_state.current_view = st.session_state.nav_radio
+
+
 def render_sidebar() -> str:
     """サイドバーをレンダリングして選択されたビューを返す"""
     with st.sidebar:
         # ロゴ/タイトル
-        st.markdown("""
-        <div style="
-            text-align: center;
-            padding: 1rem 0;
-            margin-bottom: 1rem;
-        ">
-            <div style="font-size: 2.5rem; margin-bottom: 0.5rem;">🔮</div>
-            <div style="
-                font-size: 1.25rem;
-                font-weight: 700;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-            ">自己分析アプリ</div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.html(_SIDEBAR_LOGO_HTML)
         
         # ユーザー情報カード
         if st.session_state.user_info:
             user_name = st.session_state.user_info.get('name', 'ユーザー')
-            st.markdown(f"""
-            <div style="
-                background: rgba(255, 255, 255, 0.05);
-                border: 1px solid rgba(255, 255, 255, 0.1);
-                border-radius: 12px;
-                padding: 0.75rem 1rem;
-                margin-bottom: 1rem;
-                display: flex;
-                align-items: center;
-                gap: 0.75rem;
-            ">
-                <div style="
-                    width: 36px;
-                    height: 36px;
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    border-radius: 50%;
-                    display: flex;
-                    align-items: center;
-                    justify-content: center;
-                    font-size: 1rem;
-                ">👤</div>
-                <div>
-                    <div style="font-size: 0.75rem; color: #718096;">ログイン中</div>
-                    <div style="font-size: 0.9rem; color: #e2e8f0; font-weight: 500;">{user_name}</div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+            st.html(_USER_CARD_TEMPLATE.format(user_name=user_name))
             
             if st.button("🚪 ログアウト", use_container_width=True):
                 st.session_state.user_id = None
                 st.session_state.user_info = None
+                st.session_state.clear_session_cookie = True
                 st.rerun()
 
         st.markdown("---")
@@ -180,75 +305,23 @@ def render_sidebar() -> str:
         # ナビゲーション
         current_view = st.session_state.current_view
         
-        nav_items = [
-            ("diagnostic", "🔮", "性格診断"),
-            ("journal", "📝", "ジャーナル"),
-            ("analysis", "🔍", "分析"),
-        ]
-        
-        for view_id, icon, label in nav_items:
-            is_active = current_view == view_id
-            btn_label = f"{icon} {label}"
-            
-            if is_active:
-                # アクティブ状態の強調表示
-                st.markdown(f"""
-                <div style="
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    border-radius: 12px;
-                    padding: 0.75rem 1rem;
-                    margin-bottom: 0.5rem;
-                    font-weight: 600;
-                    color: white;
-                    display: flex;
-                    align-items: center;
-                    gap: 0.5rem;
-                ">
-                    <span>{icon}</span>
-                    <span>{label}</span>
-                    <span style="margin-left: auto; font-size: 0.75rem;">●</span>
-                </div>
-                """, unsafe_allow_html=True)
-            else:
-                if st.button(btn_label, key=f"nav_{view_id}", use_container_width=True):
-                    st.session_state.current_view = view_id
-                    st.rerun()
+        # 他の画面から current_view が変更された場合にも選択状態を合わせる
+        st.session_state.nav_radio = current_view
+        st.radio(
+            "ナビゲーション",
+            options=_NAV_OPTIONS,
+            format_func=_VIEW_NAMES.get,
+            key="nav_radio",
+            on_change=_on_nav_change,
+            label_visibility="collapsed",
+        )
 
         st.markdown("---")
 
         # アプリ情報（コンパクト版）
-        st.markdown("""
-        <div style="
-            font-size: 0.8rem;
-            color: #718096;
-            text-align: center;
-            padding: 0.5rem;
-        ">
-            <div style="margin-bottom: 0.5rem;">💡 機能一覧</div>
-            <div style="display: flex; flex-wrap: wrap; gap: 0.25rem; justify-content: center;">
-                <span style="
-                    background: rgba(255,255,255,0.05);
-                    padding: 0.25rem 0.5rem;
-                    border-radius: 6px;
-                    font-size: 0.7rem;
-                ">性格診断</span>
-                <span style="
-                    background: rgba(255,255,255,0.05);
-                    padding: 0.25rem 0.5rem;
-                    border-radius: 6px;
-                    font-size: 0.7rem;
-                ">ジャーナル</span>
-                <span style="
-                    background: rgba(255,255,255,0.05);
-                    padding: 0.25rem 0.5rem;
-                    border-radius: 6px;
-                    font-size: 0.7rem;
-                ">AI分析</span>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
-
-    return st.session_state.current_view
+        st.html(_FOOTER_HTML)
+
+    return current_view
 
 
 
@@ -258,7 +331,7 @@ def main() -> None:
     init_app()
 
     # 認証チェック
-    auth_manager = AuthManager()
+    auth_manager = _get_auth_manager()
     
     # 認証が設定されていない場合（開発ローカル等）はスキップしてデフォルトユーザー
     if not auth_manager.is_configured():
@@ -277,12 +350,9 @@ def main() -> None:
     current_view = render_sidebar()
 
     # メインコンテンツを描画
-    if current_view == "diagnostic":
-        render_diagnostic_page()
-    elif current_view == "journal":
-        render_journal_page()
-    elif current_view == "analysis":
-        render_analysis_page()
+    renderer = _VIEW_RENDERERS.get(current_view)
+    if renderer:
+        renderer()
     else:
         st.error("不明な画面です")
 
@@ -5,10 +5,12 @@
 各指標（E/I, S/N, T/F, J/P）に対して7〜8問を均等に配分。
 """
 
+from typing import Final
+
 from models.data_models import Dimension, Direction, Question
 
 # 30問の診断質問データ
-DIAGNOSTIC_QUESTIONS: list[Question] = [
+DIAGNOSTIC_QUESTIONS: tuple[Question, ...] = (
     # ===== E/I（外向/内向）: 8問 =====
     Question(
         id=1,
@@ -196,22 +198,37 @@ DIAGNOSTIC_QUESTIONS: list[Question] = [
         dimension=Dimension.JP,
         direction=Direction.POSITIVE,
     ),
-]
+)
+
+# 総質問数
+TOTAL_QUESTIONS: Final[int] = len(DIAGNOSTIC_QUESTIONS)
+
+# ID から質問を引くためのインデックス
+_QUESTIONS_BY_ID: dict[int, Question] = {q.id: q for q in DIAGNOSTIC_QUESTIONS}
+
+
+def _group_by_dimension(questions: tuple[Question, ...]) -> dict[Dimension, tuple[Question, ...]]:
+    """質問を指標ごとにまとめる（インポート時に1回だけ実行）"""
+    buckets: dict[Dimension, list[Question]] = {}
+    for q in questions:
+        buckets.setdefault(q.dimension, []).append(q)
+    return {dim: tuple(qs) for dim, qs in buckets.items()}
+
+
+# 指標ごとの質問（不変）
+_BY_DIM: dict[Dimension, tuple[Question, ...]] = _group_by_dimension(DIAGNOSTIC_QUESTIONS)
 
 
-def get_questions_by_dimension(dimension: Dimension) -> list[Question]:
+def get_questions_by_dimension(dimension: Dimension) -> tuple[Question, ...]:
     """指定された指標の質問を取得"""
-    return [q for q in DIAGNOSTIC_QUESTIONS if q.dimension == dimension]
+    return _BY_DIM.get(dimension, ())
 
 
 def get_question_by_id(question_id: int) -> Question | None:
     """IDで質問を取得"""
-    for q in DIAGNOSTIC_QUESTIONS:
-        if q.id == question_id:
-            return q
-    return None
+    return _QUESTIONS_BY_ID.get(question_id)
 
 
 def get_total_questions() -> int:
     """総質問数を取得"""
-    return len(DIAGNOSTIC_QUESTIONS)
+    return TOTAL_QUESTIONS
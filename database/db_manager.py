@@ -5,20 +5,34 @@ SQLiteを使用した永続化処理を提供します。
 """
 
 import os
+import socket
 import streamlit as st
 import sqlite3
 import json
+import itertools
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Any
+from typing import Any, Callable, Iterator, Optional
+from urllib.parse import urlparse, unquote
 from zoneinfo import ZoneInfo
 
 try:
     import psycopg2
-    from psycopg2.extras import RealDictCursor
+    import psycopg2.extensions
+    import psycopg2.pool
+    from psycopg2.extras import Json, RealDictCursor, execute_values, register_default_jsonb
 except ImportError:
     psycopg2 = None
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from models.data_models import (
     DimensionScore,
     JournalEntry,
@@ -28,15 +42,158 @@ from models.data_models import (
 )
 
 
+def _dumps(value: Any) -> str:
+    """JSON文字列に変換（orjsonがあれば高速版を使用、非ASCIIはそのまま保持）"""
+    if orjson:
+        return orjson.dumps(value).decode()
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _loads(value: str | bytes) -> Any:
+    """JSON文字列を読み込む（orjsonがあれば高速版を使用）"""
+    if orjson:
+        return orjson.loads(value)
+    return json.loads(value)
+
+
+if psycopg2:
+    # JSONBカラムは取得時にドライバ側でPythonオブジェクトへ変換させる
+    register_default_jsonb(globally=True, loads=_loads)
+
+
+_JST = ZoneInfo("Asia/Tokyo")
+_UTC = ZoneInfo("UTC")
+
+# 日時を保持するカラム（テーブル名, カラム名）
+_TIMESTAMP_COLUMNS = (
+    ("personality_results", "diagnosed_at"),
+    ("journal_entries", "date"),
+    ("ai_analysis_results", "analyzed_at"),
+    ("dynamic_profiles", "last_updated"),
+)
+
+# PostgreSQLでJSONBとして保持するカラム（テーブル名, カラム名）
+_PG_JSONB_COLUMNS = (
+    ("personality_results", "dimension_scores"),
+    ("journal_entries", "tags"),
+    ("dynamic_profiles", "validated_strengths"),
+    ("dynamic_profiles", "observed_challenges"),
+    ("dynamic_profiles", "estimated_axis_scores"),
+)
+
+# AI分析結果のうち analysis_payload（JSON）にまとめて保存する項目
+_ANALYSIS_PAYLOAD_FIELDS = (
+    "behavior_patterns",
+    "thinking_patterns",
+    "emotional_triggers",
+    "values_and_beliefs",
+    "strengths",
+    "growth_areas",
+    "actionable_advice",
+)
+
 # データベースファイルのパス (SQLite用)
 DB_PATH = Path(__file__).parent.parent / "self_analysis.db"
 
+# SQLite接続はプロセス全体で使い回す（Streamlitは再実行ごとに別スレッドで動くため、スレッド単位では持たない）
+# 返却された接続は _SQLITE_POOL_MAX_IDLE 本まで保持し、それを超えた分は閉じる
+_SQLITE_POOL_MAX_IDLE = 4
+_sqlite_idle_conns: list[sqlite3.Connection] = []
+_sqlite_pool_lock = threading.Lock()
+
+# PostgreSQLのコネクションプール（初回接続時に作成）
+_PG_POOL_MIN_CONN = 1
+_PG_POOL_MAX_CONN = 10
+_pg_pool = None
+_pg_pool_lock = threading.Lock()
+# プールの getconn() は空きがないと待たずに例外を出すので、貸し出し数をセマフォで制限して待たせる
+# 待ち時間を超えた場合はプール外の接続を直接開き、返却時に閉じる
+_PG_POOL_WAIT_SECONDS = 10
+_pg_pool_slots = threading.BoundedSemaphore(_PG_POOL_MAX_CONN)
+_pg_direct_conn_ids: set[int] = set()
+
+# 一覧取得時に一度に取り出す行数
+_FETCH_BATCH_SIZE = 1000
+
+# WALモードはDBファイルに永続化されるため、プロセス内で1回だけ設定すればよい
+_wal_initialized = False
+
+# 接続ごとに適用するSQLiteのPRAGMA
+_SQLITE_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA journal_size_limit=6144000",
+)
+
+
+def _configure_sqlite(conn: sqlite3.Connection) -> None:
+    """
+    SQLite接続に性能向上のためのPRAGMAを設定
+    WAL + synchronous=NORMAL でコミットごとのfsyncを減らす
+    """
+    global _wal_initialized
+
+    if not _wal_initialized:
+        conn.execute("PRAGMA journal_mode=WAL")
+        _wal_initialized = True
+
+    for pragma in _SQLITE_CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+
+
+def _datetime_to_epoch(value: datetime) -> int:
+    """
+    datetimeをUNIX時刻（秒）に変換（SQLiteへの保存用）
+    タイムゾーンがない場合はUTCとみなす
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=_UTC)
+    return int(value.timestamp())
+
+
+# SQLiteではdatetimeをINTEGER（UNIX時刻）として保存する
+sqlite3.register_adapter(datetime, _datetime_to_epoch)
+
+
+def _load_json(value: Any) -> Any:
+    """
+    JSONカラムの値をPythonオブジェクトに変換
+    （PostgreSQLのJSONBはドライバがデコード済みの値を返すため、そのまま使う）
+    """
+    if isinstance(value, (str, bytes)):
+        return _loads(value)
+    return value
+
+
+def _is_postgres(conn) -> bool:
+    """
+    PostgreSQLの接続かどうか
+    （get_connection() が返すのは sqlite3.Connection か psycopg2 の接続のいずれか）
+    """
+    return not isinstance(conn, sqlite3.Connection)
+
+
+def _json_param(conn, value: Any) -> Any:
+    """
+    JSONカラムに書き込む値をパラメータに変換
+    PostgreSQLでは Json アダプタでドライバに直接エンコードさせ、SQLiteではJSON文字列にする
+    """
+    if not _is_postgres(conn):
+        return _dumps(value)
+    return Json(value, dumps=_dumps)
 
-def _parse_datetime(value: str | datetime) -> datetime:
+
+def _parse_datetime(value: str | int | float | datetime) -> datetime:
     """
     日付値をdatetimeに変換し、日本時間(JST)にする
     """
-    jst = ZoneInfo("Asia/Tokyo")
+    jst = _JST
+
+    if isinstance(value, (int, float)):
+        # SQLiteのUNIX時刻
+        return datetime.fromtimestamp(value, jst)
     
     if isinstance(value, str):
         try:
@@ -50,11 +207,12 @@ def _parse_datetime(value: str | datetime) -> datetime:
     # タイムゾーンがない場合はUTCとみなしてJSTに変換
     # (Streamlit Cloud等のサーバー時刻は通常UTC)
     if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=ZoneInfo("UTC"))
+        dt = dt.replace(tzinfo=_UTC)
         
     return dt.astimezone(jst)
 
 
+@lru_cache(maxsize=1)
 def _get_db_url() -> Optional[str]:
     """
     データベースURLを取得 (PostgreSQL)
@@ -68,8 +226,9 @@ def _get_db_url() -> Optional[str]:
     return os.getenv("DATABASE_URL")
 
 
+@lru_cache(maxsize=1)
 def is_cloud_environment() -> bool:
-    """Streamlit Cloud環境かどうかを判定"""
+    """Streamlit Cloud環境かどうかを判定（プロセス内で変わらないため結果をキャッシュ）"""
     # Streamlit Cloudでは特定の環境変数が設定される
     return (
         os.getenv("STREAMLIT_SHARING_MODE") is not None or
@@ -78,6 +237,7 @@ def is_cloud_environment() -> bool:
     )
 
 
+@lru_cache(maxsize=1)
 def get_db_type() -> str:
     """現在使用中のデータベースタイプを返す"""
     db_url = _get_db_url()
@@ -86,80 +246,176 @@ def get_db_type() -> str:
     return "SQLite (Local)"
 
 
-def get_connection():
-    """データベース接続を取得 (Dual DB support with safeguards and retry)"""
-    import time
-    import socket
-    from urllib.parse import urlparse, unquote
-    
-    db_url = _get_db_url()
-    
-    if db_url and psycopg2:
-        # PostgreSQL (Cloud) - リトライロジック付き
+def _pg_connect_kwargs(db_url: str) -> dict[str, Any]:
+    """
+    PostgreSQLの接続パラメータを組み立てる
+    psycopg2にDSN文字列を渡すとIPv6が使われる問題を回避するため、
+    URLを完全にパースして個別パラメータとして渡す
+    """
+    try:
+        parsed = urlparse(db_url)
+        original_host = parsed.hostname
+        port = parsed.port or 5432
+        user = unquote(parsed.username) if parsed.username else None
+        password = unquote(parsed.password) if parsed.password else None
+        dbname = parsed.path.lstrip('/') if parsed.path else 'postgres'
+
+        # IPv4アドレスを取得（IPv6問題回避）
+        if original_host:
+            try:
+                ipv4_addr = socket.gethostbyname(original_host)
+            except socket.gaierror:
+                ipv4_addr = original_host  # 解決失敗時は元のホスト名
+        else:
+            ipv4_addr = original_host
+
+    except Exception:
+        # パース失敗時はそのままDSNを使用（フォールバック）
+        ipv4_addr = None
+        user = None
+
+    if ipv4_addr and user:
+        # 個別パラメータで接続（IPv4強制）
+        return {
+            "host": ipv4_addr,
+            "port": port,
+            "user": user,
+            "password": password,
+            "dbname": dbname,
+            "cursor_factory": RealDictCursor,
+            "connect_timeout": 10,
+            "sslmode": "require",
+        }
+
+    # フォールバック：元のDSNで接続
+    return {
+        "dsn": db_url,
+        "cursor_factory": RealDictCursor,
+        "connect_timeout": 10,
+    }
+
+
+def _get_pg_pool(db_url: str):
+    """
+    PostgreSQLのコネクションプールを取得（初回のみリトライ付きで作成）
+
+    Returns:
+        ThreadedConnectionPool | None: プール（ローカルで接続失敗した場合はNone）
+    """
+    global _pg_pool
+
+    if _pg_pool is not None:
+        return _pg_pool
+
+    with _pg_pool_lock:
+        if _pg_pool is not None:
+            return _pg_pool
+
         max_retries = 3
         last_error = None
-        
-        # URLを完全にパースして個別パラメータとして渡す
-        # psycopg2にDSN文字列を渡すとIPv6が使われる問題を回避
-        try:
-            parsed = urlparse(db_url)
-            original_host = parsed.hostname
-            port = parsed.port or 5432
-            user = unquote(parsed.username) if parsed.username else None
-            password = unquote(parsed.password) if parsed.password else None
-            dbname = parsed.path.lstrip('/') if parsed.path else 'postgres'
-            
-            # IPv4アドレスを取得（IPv6問題回避）
-            if original_host:
-                try:
-                    ipv4_addr = socket.gethostbyname(original_host)
-                except socket.gaierror:
-                    ipv4_addr = original_host  # 解決失敗時は元のホスト名
-            else:
-                ipv4_addr = original_host
-                
-        except Exception as parse_error:
-            # パース失敗時はそのままDSNを使用（フォールバック）
-            ipv4_addr = None
-            original_host = None
+        connect_kwargs = _pg_connect_kwargs(db_url)
 
         for attempt in range(max_retries):
             try:
-                if ipv4_addr and user:
-                    # 個別パラメータで接続（IPv4強制）
-                    conn = psycopg2.connect(
-                        host=ipv4_addr,
-                        port=port,
-                        user=user,
-                        password=password,
-                        dbname=dbname,
-                        cursor_factory=RealDictCursor,
-                        connect_timeout=10,
-                        sslmode='require'
-                    )
-                else:
-                    # フォールバック：元のDSNで接続
-                    conn = psycopg2.connect(
-                        db_url,
-                        cursor_factory=RealDictCursor,
-                        connect_timeout=10
-                    )
-                return conn
+                _pg_pool = psycopg2.pool.ThreadedConnectionPool(
+                    _PG_POOL_MIN_CONN, _PG_POOL_MAX_CONN, **connect_kwargs
+                )
+                return _pg_pool
             except Exception as e:
                 last_error = e
                 if attempt < max_retries - 1:
                     time.sleep(1)  # 1秒待ってリトライ
                     continue
-        
-        # 全リトライ失敗
-        if is_cloud_environment():
-            raise ConnectionError(
-                f"PostgreSQLへの接続に失敗しました（{max_retries}回リトライ後）。: {last_error}"
-            )
-        else:
-            # ローカル開発ではフォールバックを許可
-            print(f"PostgreSQL connection failed: {last_error}. Falling back to SQLite.")
-    
+
+    # 全リトライ失敗
+    if is_cloud_environment():
+        raise ConnectionError(
+            f"PostgreSQLへの接続に失敗しました（{max_retries}回リトライ後）。: {last_error}"
+        )
+
+    # ローカル開発ではフォールバックを許可
+    print(f"PostgreSQL connection failed: {last_error}. Falling back to SQLite.")
+    return None
+
+
+def _get_sqlite_conn() -> sqlite3.Connection:
+    """
+    使い回すSQLite接続を取得（空きがなければ新しく開く）
+    接続は同時に1つのスレッドだけが使うので、別スレッドへの受け渡しを許可して開く
+    """
+    with _sqlite_pool_lock:
+        if _sqlite_idle_conns:
+            return _sqlite_idle_conns.pop()
+
+    conn = sqlite3.connect(str(DB_PATH), check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    _configure_sqlite(conn)
+    return conn
+
+
+def _release_sqlite_conn(conn: sqlite3.Connection) -> None:
+    """SQLite接続を未確定のトランザクションを巻き戻してから空き接続に戻す（上限を超える分は閉じる）"""
+    if conn.in_transaction:
+        conn.rollback()
+    with _sqlite_pool_lock:
+        if len(_sqlite_idle_conns) < _SQLITE_POOL_MAX_IDLE:
+            _sqlite_idle_conns.append(conn)
+            return
+    conn.close()
+
+
+def _is_pg_conn_alive(conn) -> bool:
+    """
+    プールの接続が使えるか確認する
+    サーバー側のアイドルタイムアウトで切られた接続は、クエリを投げるまで closed にならないため実際に問い合わせる
+    """
+    if conn.closed:
+        return False
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        return False
+
+
+def _get_pg_conn(pool, db_url: str):
+    """
+    PostgreSQL接続をプールから取得（空きがなければ一定時間待ち、それでも空かなければ直接接続する）
+    切断済みの接続は破棄して取り直す
+    """
+    if not _pg_pool_slots.acquire(timeout=_PG_POOL_WAIT_SECONDS):
+        conn = psycopg2.connect(**_pg_connect_kwargs(db_url))
+        _pg_direct_conn_ids.add(id(conn))
+        return conn
+
+    try:
+        # 切断済みの接続はプール内に複数残っていることがあるため、最大数まで取り直す
+        for _ in range(_PG_POOL_MAX_CONN):
+            conn = pool.getconn()
+            if _is_pg_conn_alive(conn):
+                return conn
+            pool.putconn(conn, close=True)
+        return pool.getconn()
+    except Exception:
+        _pg_pool_slots.release()
+        raise
+
+
+def get_connection():
+    """
+    データベース接続を取得 (Dual DB support with safeguards and retry)
+    PostgreSQLはプールから（満杯なら待つか直接接続）、SQLiteは使い回している接続（空きがなければ新規）を返す。
+    使い終わったら release_connection() で返却すること。
+    """
+    db_url = _get_db_url()
+
+    if db_url and psycopg2:
+        pool = _get_pg_pool(db_url)
+        if pool is not None:
+            return _get_pg_conn(pool, db_url)
+
     # クラウド環境でDB URLがない場合はエラー
     if is_cloud_environment() and not db_url:
         raise ConnectionError(
@@ -167,139 +423,439 @@ def get_connection():
         )
 
     # SQLite (Local only)
-    conn = sqlite3.connect(str(DB_PATH))
-    conn.row_factory = sqlite3.Row
-    return conn
+    return _get_sqlite_conn()
 
 
-def _execute(cursor, query: str, params: tuple = ()) -> None:
+def release_connection(conn) -> None:
     """
-    クエリ実行ラッパー
-    SQLite (?) と PostgreSQL (%s) のプレースホルダの違いを吸収
+    get_connection() で取得した接続を返却
+    SQLiteは閉じずに使い回し、未確定のトランザクションのみ巻き戻す
     """
-    # PostgreSQL接続判定 (psycopg2のカーソルかどうか)
-    is_postgres = hasattr(cursor, "query") 
-    
-    if is_postgres:
-        # SQLite形式(?) を Postgres形式(%s) に変換
-        query = query.replace("?", "%s")
-    
-    cursor.execute(query, params)
+    if not _is_postgres(conn):
+        _release_sqlite_conn(conn)
+        return
+
+    if _pg_pool is None or id(conn) in _pg_direct_conn_ids:
+        # プール外で開いた接続は閉じる
+        _pg_direct_conn_ids.discard(id(conn))
+        conn.close()
+        return
+
+    # putconn は未確定のトランザクションをロールバックしてからプールへ戻す
+    try:
+        _pg_pool.putconn(conn, close=bool(conn.closed))
+    finally:
+        _pg_pool_slots.release()
+
+
+@contextmanager
+def _connection():
+    """接続の取得と返却を例外安全に行うコンテキストマネージャ"""
+    conn = get_connection()
+    try:
+        yield conn
+    finally:
+        release_connection(conn)
+
+
+def _tuple_cursor(conn):
+    """
+    行をタプルで返すカーソルを取得（位置でアンパックするため）
+    PostgreSQLの接続は既定で RealDictCursor なので通常のカーソルに切り替える
+    """
+    if not _is_postgres(conn):
+        # sqlite3.Row はそのまま位置アンパックできる
+        return conn.cursor()
+    return conn.cursor(cursor_factory=psycopg2.extensions.cursor)
+
+
+def _stream_cursor(conn, name: str):
+    """
+    履歴の逐次取得用カーソルを取得（行はタプルで返る）
+    PostgreSQLではサーバーサイドの名前付きカーソルを使い、
+    結果全体をクライアントに読み込まずに _FETCH_BATCH_SIZE 件ずつ受信する
+    """
+    if not _is_postgres(conn):
+        return conn.cursor()
+    cursor = conn.cursor(name=name, cursor_factory=psycopg2.extensions.cursor)
+    cursor.itersize = _FETCH_BATCH_SIZE
+    return cursor
+
+
+def _iter_rows(cursor):
+    """fetchmany で一定件数ずつ行を取り出す（メモリ使用量を抑える）"""
+    while True:
+        rows = cursor.fetchmany(_FETCH_BATCH_SIZE)
+        if not rows:
+            return
+        yield from rows
 
 
 def _execute_and_get_id(conn, cursor, query: str, params: tuple = ()) -> int:
     """
     INSERT実行後にIDを取得するラッパー
+    PostgreSQL用のクエリには RETURNING id があらかじめ付与されている
     """
-    is_postgres = hasattr(cursor, "query")
-    
-    if is_postgres:
-        # SQLite形式(?) を Postgres形式(%s) に変換
-        query = query.replace("?", "%s")
-        # RETURNING id を追加 (ただし既に含まれていない場合)
-        if "RETURNING" not in query.upper():
-            query += " RETURNING id"
-        
-        cursor.execute(query, params)
+    cursor.execute(query, params)
+
+    if not _is_postgres(conn):
+        return cursor.lastrowid if cursor.lastrowid else 0
+
+    row = cursor.fetchone()
+    return row["id"] if row else 0
+
+
+# アプリで使うクエリ（SQLite形式）。方言ごとの変換はモジュール読み込み時に1回だけ行う
+_SQLITE_QUERIES: dict[str, str] = {
+    "insert_personality_result": """
+        INSERT INTO personality_results (user_id, personality_type, dimension_scores, diagnosed_at)
+        VALUES (?, ?, ?, ?)
+    """,
+    "select_latest_personality": """
+        SELECT * FROM personality_results
+        WHERE user_id = ?
+        ORDER BY diagnosed_at DESC
+        LIMIT 1
+    """,
+    "select_personality_history": """
+        SELECT user_id, personality_type, dimension_scores, diagnosed_at
+        FROM personality_results
+        WHERE user_id = ?
+        ORDER BY diagnosed_at DESC
+    """,
+    "insert_journal_entry": """
+        INSERT INTO journal_entries (user_id, date, content, tags, emotion_score, personality_type)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """,
+    "select_journal_entries": """
+        SELECT id, user_id, date, content, tags, emotion_score, personality_type
+        FROM journal_entries
+        WHERE user_id = ?
+        ORDER BY date DESC
+        LIMIT ?
+    """,
+    "update_journal_entry": """
+        UPDATE journal_entries
+        SET content = ?, tags = ?, emotion_score = ?
+        WHERE id = ?
+    """,
+    "delete_journal_entry": "DELETE FROM journal_entries WHERE id = ?",
+    "select_all_tags": """
+        SELECT DISTINCT json_each.value AS value
+        FROM journal_entries, json_each(journal_entries.tags)
+        WHERE journal_entries.user_id = ?
+          AND length(json_each.value) > 0
+    """,
+    "select_journal_entries_by_tag": """
+        SELECT id, user_id, date, content, tags, emotion_score, personality_type
+        FROM journal_entries
+        WHERE user_id = ?
+          AND EXISTS (SELECT 1 FROM json_each(journal_entries.tags) WHERE json_each.value = ?)
+        ORDER BY date DESC
+        LIMIT ?
+    """,
+    "insert_ai_analysis_result": """
+        INSERT INTO ai_analysis_results (user_id, analysis_payload, overall_summary, analyzed_at)
+        VALUES (?, ?, ?, ?)
+    """,
+    "select_latest_ai_analysis": """
+        SELECT id, user_id, analysis_payload, overall_summary, analyzed_at
+        FROM ai_analysis_results
+        WHERE user_id = ?
+        ORDER BY analyzed_at DESC
+        LIMIT 1
+    """,
+    "select_ai_analysis_history": """
+        SELECT id, user_id, analysis_payload, overall_summary, analyzed_at
+        FROM ai_analysis_results
+        WHERE user_id = ?
+        ORDER BY analyzed_at DESC
+        LIMIT ?
+    """,
+    "upsert_dynamic_profile": """
+        INSERT INTO dynamic_profiles (
+            user_id, base_type, refined_description,
+            validated_strengths, observed_challenges, estimated_axis_scores, last_updated
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET
+            base_type=excluded.base_type,
+            refined_description=excluded.refined_description,
+            validated_strengths=excluded.validated_strengths,
+            observed_challenges=excluded.observed_challenges,
+            estimated_axis_scores=excluded.estimated_axis_scores,
+            last_updated=excluded.last_updated
+    """,
+    "select_dynamic_profile": "SELECT * FROM dynamic_profiles WHERE user_id = ?",
+}
+
+# PostgreSQL形式（? -> %s、IDを返すINSERTには RETURNING id を付与）
+_PG_QUERIES: dict[str, str] = {
+    name: query.replace("?", "%s") for name, query in _SQLITE_QUERIES.items()
+}
+for _name in ("insert_personality_result", "insert_journal_entry", "insert_ai_analysis_result"):
+    _PG_QUERIES[_name] = _PG_QUERIES[_name].rstrip() + " RETURNING id"
+del _name
+_PG_QUERIES["select_all_tags"] = """
+    SELECT DISTINCT tag.value AS value
+    FROM journal_entries, jsonb_array_elements_text(journal_entries.tags::jsonb) AS tag(value)
+    WHERE journal_entries.user_id = %s
+      AND length(tag.value) > 0
+"""
+_PG_QUERIES["select_journal_entries_by_tag"] = """
+    SELECT id, user_id, date, content, tags, emotion_score, personality_type
+    FROM journal_entries
+    WHERE user_id = %s
+      AND EXISTS (
+          SELECT 1 FROM jsonb_array_elements_text(journal_entries.tags::jsonb) AS tag(value)
+          WHERE tag.value = %s
+      )
+    ORDER BY date DESC
+    LIMIT %s
+"""
+
+# execute_values 用の複数行INSERT（VALUES %s）
+_PG_BATCH_INSERTS: dict[str, str] = {
+    name: _SQLITE_QUERIES[name][:_SQLITE_QUERIES[name].index("VALUES")] + "VALUES %s"
+    for name in ("insert_personality_result", "insert_journal_entry")
+}
+
+
+def _queries(conn) -> dict[str, str]:
+    """接続の種類に対応する方言のクエリ集を返す"""
+    if not _is_postgres(conn):
+        return _SQLITE_QUERIES
+    return _PG_QUERIES
+
+
+
+# ユーザーごとの時系列取得用インデックス（WHERE user_id + ORDER BY ... DESC）
+_AI_ANALYSIS_INDEX_DDL = """
+    CREATE INDEX IF NOT EXISTS idx_ai_user_time
+    ON ai_analysis_results(user_id, analyzed_at DESC)
+"""
+_INDEX_DDL = (
+    """
+    CREATE INDEX IF NOT EXISTS idx_pr_user_time
+    ON personality_results(user_id, diagnosed_at DESC)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_je_user_date
+    ON journal_entries(user_id, date DESC)
+    """,
+    _AI_ANALYSIS_INDEX_DDL,
+)
+
+
+def _migrate_timestamps(cursor, is_postgres: bool) -> None:
+    """
+    既存テーブルの日時カラムを新しい形式に移行
+
+    - SQLite: ISO 8601文字列をUNIX時刻（INTEGER）に変換
+      （TIMESTAMP宣言のカラムはNUMERIC型親和性のため、整数をそのまま格納できる）
+    - PostgreSQL: TIMESTAMP（タイムゾーンなし）をUTCとみなしてTIMESTAMPTZに変換
+    """
+    for table, column in _TIMESTAMP_COLUMNS:
+        if is_postgres:
+            cursor.execute(
+                """
+                SELECT data_type FROM information_schema.columns
+                WHERE table_name = %s AND column_name = %s
+                """,
+                (table, column),
+            )
+            row = cursor.fetchone()
+            if row and row["data_type"] == "timestamp without time zone":
+                cursor.execute(
+                    f"ALTER TABLE {table} ALTER COLUMN {column} "
+                    f"TYPE TIMESTAMPTZ USING {column} AT TIME ZONE 'UTC'"
+                )
+        else:
+            # 解釈できない文字列はそのまま残す（読み込み時に _parse_datetime で処理）
+            cursor.execute(
+                f"""
+                UPDATE {table}
+                SET {column} = COALESCE(CAST(strftime('%s', {column}) AS INTEGER), {column})
+                WHERE typeof({column}) = 'text'
+                """
+            )
+
+
+def _migrate_jsonb_columns(cursor) -> None:
+    """PostgreSQLの既存テーブルでTEXT型のままのJSONカラムをJSONBに変換"""
+    for table, column in _PG_JSONB_COLUMNS:
+        cursor.execute(
+            """
+            SELECT data_type FROM information_schema.columns
+            WHERE table_name = %s AND column_name = %s
+            """,
+            (table, column),
+        )
         row = cursor.fetchone()
-        return row["id"] if row else 0
+        if row and row["data_type"] == "text":
+            cursor.execute(
+                f"ALTER TABLE {table} ALTER COLUMN {column} TYPE JSONB USING {column}::jsonb"
+            )
+
+
+def _migrate_ai_analysis_payload(cursor, is_postgres: bool, table_ddl: str) -> None:
+    """
+    旧スキーマ（項目ごとのJSON文字列カラム）のAI分析結果を analysis_payload に移行
+
+    旧カラムが残っている場合のみ、テーブルを作り直して既存行をコピーする。
+
+    Args:
+        cursor: カーソル
+        is_postgres: PostgreSQLかどうか
+        table_ddl: 新スキーマの CREATE TABLE 文
+    """
+    if is_postgres:
+        cursor.execute("""
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'ai_analysis_results' AND column_name = 'behavior_patterns'
+        """)
+        if cursor.fetchone() is None:
+            return
+        build_payload = "jsonb_build_object({})".format(
+            ", ".join(f"'{field}', {field}::jsonb" for field in _ANALYSIS_PAYLOAD_FIELDS)
+        )
     else:
-        # SQLite
-        cursor.execute(query, params)
-        return cursor.lastrowid if cursor.lastrowid else 0
+        cursor.execute("PRAGMA table_info(ai_analysis_results)")
+        if "behavior_patterns" not in {row[1] for row in cursor.fetchall()}:
+            return
+        build_payload = "json_object({})".format(
+            ", ".join(f"'{field}', json({field})" for field in _ANALYSIS_PAYLOAD_FIELDS)
+        )
 
+    cursor.execute("ALTER TABLE ai_analysis_results RENAME TO ai_analysis_results_legacy")
+    cursor.execute(table_ddl)
+    cursor.execute(f"""
+        INSERT INTO ai_analysis_results (id, user_id, analysis_payload, overall_summary, analyzed_at)
+        SELECT id, user_id, {build_payload}, overall_summary, analyzed_at
+        FROM ai_analysis_results_legacy
+    """)
+    # 旧テーブルのインデックスも一緒に削除されるため、新テーブルに作り直す
+    cursor.execute("DROP TABLE ai_analysis_results_legacy")
+    cursor.execute(_AI_ANALYSIS_INDEX_DDL)
+
+    if is_postgres:
+        # IDを指定してコピーしたため、SERIALのシーケンスを最大IDに合わせる
+        cursor.execute("""
+            SELECT setval(
+                pg_get_serial_sequence('ai_analysis_results', 'id'),
+                COALESCE(MAX(id), 0) + 1,
+                false
+            )
+            FROM ai_analysis_results
+        """)
 
 
 def init_database() -> None:
     """データベースとテーブルを初期化"""
-    conn = get_connection()
-    cursor = conn.cursor()
+    with _connection() as conn:
+        cursor = conn.cursor()
     
-    # PostgreSQL判定
-    is_postgres = hasattr(cursor, "query")
+        # PostgreSQL判定
+        is_postgres = _is_postgres(conn)
     
-    # ID定義（PostgreSQL: SERIAL, SQLite: INTEGER AUTOINCREMENT）
-    if is_postgres:
-        id_def = "SERIAL PRIMARY KEY"
-    else:
-        id_def = "INTEGER PRIMARY KEY AUTOINCREMENT"
+        # ID定義（PostgreSQL: SERIAL, SQLite: INTEGER AUTOINCREMENT）
+        # 日時定義（PostgreSQL: TIMESTAMPTZ, SQLite: UNIX時刻のINTEGER）
+        # JSON定義（PostgreSQL: JSONB, SQLite: TEXT）
+        if is_postgres:
+            id_def = "SERIAL PRIMARY KEY"
+            ts_def = "TIMESTAMPTZ"
+            json_def = "JSONB"
+        else:
+            id_def = "INTEGER PRIMARY KEY AUTOINCREMENT"
+            ts_def = "INTEGER"
+            json_def = "TEXT"
+
+        # タグはJSON配列として保存（SQLiteでは不正なJSONを書き込み時に弾く）
+        tags_def = "JSONB NOT NULL" if is_postgres else "TEXT NOT NULL CHECK(json_valid(tags))"
+
+        # 性格診断結果テーブル
+        personality_ddl = f"""
+            CREATE TABLE IF NOT EXISTS personality_results (
+                id {id_def},
+                user_id TEXT NOT NULL,
+                personality_type TEXT NOT NULL,
+                dimension_scores {json_def} NOT NULL,
+                diagnosed_at {ts_def} NOT NULL
+            )
+        """
 
-    # 性格診断結果テーブル
-    cursor.execute(f"""
-        CREATE TABLE IF NOT EXISTS personality_results (
-            id {id_def},
-            user_id TEXT NOT NULL,
-            personality_type TEXT NOT NULL,
-            dimension_scores TEXT NOT NULL,
-            diagnosed_at TIMESTAMP NOT NULL
-        )
-    """)
+        # ジャーナルエントリーテーブル
+        journal_ddl = f"""
+            CREATE TABLE IF NOT EXISTS journal_entries (
+                id {id_def},
+                user_id TEXT NOT NULL,
+                date {ts_def} NOT NULL,
+                content TEXT NOT NULL,
+                tags {tags_def},
+                emotion_score INTEGER NOT NULL,
+                personality_type TEXT
+            )
+        """
 
-    # ジャーナルエントリーテーブル
-    cursor.execute(f"""
-        CREATE TABLE IF NOT EXISTS journal_entries (
-            id {id_def},
-            user_id TEXT NOT NULL,
-            date TIMESTAMP NOT NULL,
-            content TEXT NOT NULL,
-            tags TEXT NOT NULL,
-            emotion_score INTEGER NOT NULL,
-            personality_type TEXT
-        )
-    """)
+        # AI分析結果テーブル（リスト項目は analysis_payload にまとめて保存）
+        ai_analysis_ddl = f"""
+            CREATE TABLE IF NOT EXISTS ai_analysis_results (
+                id {id_def},
+                user_id TEXT NOT NULL,
+                analysis_payload {json_def} NOT NULL,
+                overall_summary TEXT NOT NULL,
+                analyzed_at {ts_def} NOT NULL
+            )
+        """
 
-    # AI分析結果テーブル
-    cursor.execute(f"""
-        CREATE TABLE IF NOT EXISTS ai_analysis_results (
-            id {id_def},
-            user_id TEXT NOT NULL,
-            behavior_patterns TEXT NOT NULL,
-            thinking_patterns TEXT NOT NULL,
-            emotional_triggers TEXT NOT NULL,
-            values_and_beliefs TEXT NOT NULL,
-            strengths TEXT NOT NULL,
-            growth_areas TEXT NOT NULL,
-            actionable_advice TEXT NOT NULL,
-            overall_summary TEXT NOT NULL,
-            analyzed_at TIMESTAMP NOT NULL
-        )
-    """)
+        # ダイナミック・タイプ・プロファイルテーブル
+        dynamic_profile_ddl = f"""
+            CREATE TABLE IF NOT EXISTS dynamic_profiles (
+                user_id TEXT PRIMARY KEY,
+                base_type TEXT NOT NULL,
+                refined_description TEXT NOT NULL,
+                validated_strengths {json_def} NOT NULL,
+                observed_challenges {json_def} NOT NULL,
+                estimated_axis_scores {json_def},
+                last_updated {ts_def} NOT NULL
+            )
+        """
 
-    # ダイナミック・タイプ・プロファイルテーブル
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS dynamic_profiles (
-            user_id TEXT PRIMARY KEY,
-            base_type TEXT NOT NULL,
-            refined_description TEXT NOT NULL,
-            validated_strengths TEXT NOT NULL,
-            observed_challenges TEXT NOT NULL,
-            estimated_axis_scores TEXT,
-            last_updated TIMESTAMP NOT NULL
-        )
-    """)
+        # テーブルとインデックスを1つのスクリプトにまとめて1回で実行
+        schema_script = ";".join((
+            personality_ddl,
+            journal_ddl,
+            ai_analysis_ddl,
+            dynamic_profile_ddl,
+            *_INDEX_DDL,
+        ))
+        if is_postgres:
+            # psycopg2 はセミコロン区切りの複数文を1回で送信できる（同一トランザクション内）
+            cursor.execute(schema_script)
+        else:
+            # executescript は自動コミットで1文ずつ実行するため、明示的に1トランザクションにする
+            cursor.executescript(f"BEGIN;{schema_script};COMMIT;")
 
-    conn.commit()
-    conn.close()
+        # 旧形式（ISO文字列 / タイムゾーンなしTIMESTAMP）の日時を移行
+        _migrate_timestamps(cursor, is_postgres)
 
+        # 旧形式（項目ごとのJSONカラム）のAI分析結果を移行
+        _migrate_ai_analysis_payload(cursor, is_postgres, ai_analysis_ddl)
 
-def save_personality_result(result: PersonalityResult) -> int:
-    """
-    性格診断結果を保存
+        # PostgreSQLのTEXT型のJSONカラムをJSONBに移行
+        if is_postgres:
+            _migrate_jsonb_columns(cursor)
 
-    Args:
-        result: 診断結果
+        conn.commit()
 
-    Returns:
-        int: 保存されたレコードのID
-    """
-    conn = get_connection()
-    cursor = conn.cursor()
 
-    # DimensionScoreをJSON文字列に変換
-    dimension_scores_json = json.dumps(
+def _personality_result_params(conn, result: PersonalityResult) -> tuple:
+    """性格診断結果をINSERT用のパラメータに変換"""
+    # DimensionScoreをJSONに変換
+    dimension_scores_json = _json_param(conn, 
         [
             {
-                "dimension": score.dimension.value,
+                "dimension": score.dimension.name,
                 "first_type": score.first_type,
                 "second_type": score.second_type,
                 "first_score": score.first_score,
@@ -308,31 +864,104 @@ def save_personality_result(result: PersonalityResult) -> int:
                 "strength_percent": score.strength_percent,
             }
             for score in result.dimension_scores
-        ],
-        ensure_ascii=False,
+        ]
+    )
+    return (
+        result.user_id,
+        result.personality_type,
+        dimension_scores_json,
+        result.diagnosed_at,
     )
 
-    query = """
-        INSERT INTO personality_results (user_id, personality_type, dimension_scores, diagnosed_at)
-        VALUES (?, ?, ?, ?)
-        """
-    
-    inserted_id = _execute_and_get_id(
-        conn, cursor, query,
-        (
-            result.user_id,
-            result.personality_type,
-            dimension_scores_json,
-            result.diagnosed_at.isoformat(),
-        )
+
+def _journal_entry_params(conn, entry: JournalEntry) -> tuple:
+    """ジャーナルエントリーをINSERT用のパラメータに変換"""
+    return (
+        entry.user_id,
+        entry.date,
+        entry.content,
+        _json_param(conn, entry.tags),
+        entry.emotion_score,
+        entry.personality_type,
     )
 
-    conn.commit()
-    conn.close()
 
+def _insert_many(query_name: str, to_params: Callable[[Any, Any], tuple], items: list) -> int:
+    """
+    複数行を1トランザクションでまとめてINSERT
+    PostgreSQLでは execute_values で1本の複数行INSERTにまとめる
+
+    Args:
+        query_name: INSERT文のクエリ名
+        to_params: (接続, 要素) からINSERT用のパラメータを作る関数
+        items: 保存する要素のリスト
+
+    Returns:
+        int: INSERTした件数
+    """
+    if not items:
+        return 0
+
+    with _connection() as conn:
+        cursor = conn.cursor()
+        rows = [to_params(conn, item) for item in items]
+
+        if not _is_postgres(conn):
+            cursor.executemany(_SQLITE_QUERIES[query_name], rows)
+        else:
+            execute_values(cursor, _PG_BATCH_INSERTS[query_name], rows)
+
+        conn.commit()
+
+    return len(rows)
+
+
+def save_personality_result(result: PersonalityResult) -> int:
+    """
+    性格診断結果を保存
+
+    Args:
+        result: 診断結果
+
+    Returns:
+        int: 保存されたレコードのID
+    """
+    with _connection() as conn:
+        cursor = conn.cursor()
+        inserted_id = _execute_and_get_id(
+            conn, cursor, _queries(conn)["insert_personality_result"], _personality_result_params(conn, result)
+        )
+
+        conn.commit()
+
+    get_latest_personality.clear()
+    get_user_bundle.clear()
     return inserted_id
 
 
+def save_personality_results(results: list[PersonalityResult]) -> int:
+    """
+    複数の性格診断結果を1トランザクションでまとめて保存
+
+    Args:
+        results: 診断結果のリスト
+
+    Returns:
+        int: 保存した件数
+    """
+    saved = _insert_many(
+        "insert_personality_result",
+        _personality_result_params,
+        results,
+    )
+
+    get_latest_personality.clear()
+    get_user_bundle.clear()
+    return saved
+
+
+# 読み取り結果のキャッシュ（書き込み時に clear() で無効化する）
+@st.cache_data(ttl=60, show_spinner=False)
 def get_latest_personality(user_id: str) -> Optional[PersonalityResult]:
     """
     最新の性格診断結果を取得
@@ -343,31 +972,27 @@ def get_latest_personality(user_id: str) -> Optional[PersonalityResult]:
     Returns:
         Optional[PersonalityResult]: 診断結果（存在しない場合はNone）
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    with _connection() as conn:
+        cursor = conn.cursor()
+        queries = _queries(conn)
 
-    _execute(
-        cursor,
-        """
-        SELECT * FROM personality_results
-        WHERE user_id = ?
-        ORDER BY diagnosed_at DESC
-        LIMIT 1
-        """,
-        (user_id,)
-    )
+        cursor.execute(queries["select_latest_personality"], (user_id,))
 
-    row = cursor.fetchone()
-    conn.close()
+        row = cursor.fetchone()
 
     if row is None:
         return None
 
-    # JSON文字列からDimensionScoreを復元
-    dimension_scores_data = json.loads(row["dimension_scores"])
+    return _personality_result_from_row(row)
+
+
+def _personality_result_from_row(row) -> PersonalityResult:
+    """personality_results の1行（列名でアクセスできる行）を PersonalityResult に変換"""
+    # JSONからDimensionScoreを復元
+    dimension_scores_data = _load_json(row["dimension_scores"])
     dimension_scores = [
         DimensionScore(
-            dimension=Dimension(score["dimension"]),
+            dimension=Dimension[score["dimension"]],
             first_type=score["first_type"],
             second_type=score["second_type"],
             first_score=score["first_score"],
@@ -386,6 +1011,31 @@ def get_latest_personality(user_id: str) -> Optional[PersonalityResult]:
     )
 
 
+# ユーザーごとのジャーナルのリビジョン番号（ジャーナルから作る集計のキャッシュキーに使う）
+# 書き込みのたびにプロセス全体の連番から振り直すので、同じユーザーで値が戻ることはない
+_journal_revision_counter = itertools.count(1)
+_journal_revisions: dict[str, int] = {}
+
+
+def _bump_journal_revision(user_id: str) -> None:
+    """ユーザーのジャーナルが変更されたことを記録する"""
+    _journal_revisions[user_id] = next(_journal_revision_counter)
+    get_user_bundle.clear()
+
+
+def get_journal_revision(user_id: str) -> int:
+    """
+    ジャーナルのリビジョン番号を取得
+
+    Args:
+        user_id: ユーザーID
+
+    Returns:
+        int: このプロセスでそのユーザーのジャーナルが追加・更新・削除されるたびに変わる番号
+    """
+    return _journal_revisions.get(user_id, 0)
+
+
 def save_journal_entry(entry: JournalEntry) -> int:
     """
     ジャーナルエントリーを保存
@@ -396,32 +1046,39 @@ def save_journal_entry(entry: JournalEntry) -> int:
     Returns:
         int: 保存されたレコードのID
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    query = """
-        INSERT INTO journal_entries (user_id, date, content, tags, emotion_score, personality_type)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """
-    
-    inserted_id = _execute_and_get_id(
-        conn, cursor, query,
-        (
-            entry.user_id,
-            entry.date.isoformat(),
-            entry.content,
-            json.dumps(entry.tags, ensure_ascii=False),
-            entry.emotion_score,
-            entry.personality_type,
+    with _connection() as conn:
+        cursor = conn.cursor()
+        inserted_id = _execute_and_get_id(
+            conn, cursor, _queries(conn)["insert_journal_entry"], _journal_entry_params(conn, entry)
         )
-    )
 
-    conn.commit()
-    conn.close()
+        conn.commit()
 
+    _bump_journal_revision(entry.user_id)
     return inserted_id
 
 
+def save_journal_entries(entries: list[JournalEntry]) -> int:
+    """
+    複数のジャーナルエントリーを1トランザクションでまとめて保存
+
+    Args:
+        entries: ジャーナルエントリーのリスト
+
+    Returns:
+        int: 保存した件数
+    """
+    saved = _insert_many(
+        "insert_journal_entry",
+        _journal_entry_params,
+        entries,
+    )
+
+    for user_id in {entry.user_id for entry in entries}:
+        _bump_journal_revision(user_id)
+    return saved
+
+
 def get_journal_entries(
     user_id: str,
     limit: int = 50,
@@ -436,38 +1093,56 @@ def get_journal_entries(
     Returns:
         list[JournalEntry]: ジャーナルエントリーのリスト
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    return _fetch_journal_entries("select_journal_entries", (user_id, limit))
 
-    _execute(
-        cursor,
-        """
-        SELECT * FROM journal_entries
-        WHERE user_id = ?
-        ORDER BY date DESC
-        LIMIT ?
-        """,
-        (user_id, limit)
-    )
 
-    rows = cursor.fetchall()
-    conn.close()
+def get_entries_by_tag(
+    user_id: str,
+    tag: str,
+    limit: int = 50,
+) -> list[JournalEntry]:
+    """
+    指定したタグが付いたジャーナルエントリーを取得（タグの絞り込みはDB側で行う）
 
-    entries = []
-    for row in rows:
-        entries.append(
-            JournalEntry(
-                id=row["id"],
-                user_id=row["user_id"],
-                date=_parse_datetime(row["date"]),
-                content=row["content"],
-                tags=json.loads(row["tags"]),
-                emotion_score=row["emotion_score"],
-                personality_type=row["personality_type"],
-            )
-        )
+    Args:
+        user_id: ユーザーID
+        tag: タグ
+        limit: 取得件数上限
 
-    return entries
+    Returns:
+        list[JournalEntry]: ジャーナルエントリーのリスト（新しい順）
+    """
+    return _fetch_journal_entries("select_journal_entries_by_tag", (user_id, tag, limit))
+
+
+def _fetch_journal_entries(query_name: str, params: tuple) -> list[JournalEntry]:
+    """
+    ジャーナルエントリーを取得するクエリを実行し、モデルのリストに変換
+    （クエリは id, user_id, date, content, tags, emotion_score, personality_type の順に列を返す）
+    """
+    with _connection() as conn:
+        cursor = _tuple_cursor(conn)
+        queries = _queries(conn)
+
+        cursor.execute(queries[query_name], params)
+
+        return _journal_entries_from_cursor(cursor)
+
+
+def _journal_entries_from_cursor(cursor) -> list[JournalEntry]:
+    """実行済みのジャーナル取得クエリの結果（タプルの行）をモデルのリストに変換"""
+    return [
+        JournalEntry(
+            id=entry_id,
+            user_id=entry_user_id,
+            date=_parse_datetime(date),
+            content=content,
+            tags=_load_json(tags),
+            emotion_score=emotion_score,
+            personality_type=personality_type,
+        )
+        for entry_id, entry_user_id, date, content, tags, emotion_score, personality_type in _iter_rows(cursor)
+    ]
 
 
 def get_all_personality_results(user_id: str) -> list[PersonalityResult]:
@@ -480,72 +1155,75 @@ def get_all_personality_results(user_id: str) -> list[PersonalityResult]:
     Returns:
         list[PersonalityResult]: 診断結果のリスト
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    return list(iter_personality_results(user_id))
 
-    _execute(
-        cursor,
-        """
-        SELECT * FROM personality_results
-        WHERE user_id = ?
-        ORDER BY diagnosed_at DESC
-        """,
-        (user_id,)
-    )
 
-    rows = cursor.fetchall()
-    conn.close()
+def iter_personality_results(user_id: str) -> Iterator[PersonalityResult]:
+    """
+    性格診断結果を新しい順に1件ずつ取得
 
-    results = []
-    for row in rows:
-        dimension_scores_data = json.loads(row["dimension_scores"])
-        dimension_scores = [
-            DimensionScore(
-                dimension=Dimension(score["dimension"]),
-                first_type=score["first_type"],
-                second_type=score["second_type"],
-                first_score=score["first_score"],
-                second_score=score["second_score"],
-                dominant_type=score["dominant_type"],
-                strength_percent=score["strength_percent"],
-            )
-            for score in dimension_scores_data
-        ]
+    結果全体をメモリに展開しないため、件数が多い場合に使う。
+    接続はイテレーションが終わる（またはジェネレーターが閉じられる）まで保持される。
 
-        results.append(
-            PersonalityResult(
-                user_id=row["user_id"],
-                personality_type=row["personality_type"],
+    Args:
+        user_id: ユーザーID
+
+    Yields:
+        PersonalityResult: 診断結果
+    """
+    with _connection() as conn:
+        cursor = _stream_cursor(conn, "personality_history")
+        queries = _queries(conn)
+
+        cursor.execute(queries["select_personality_history"], (user_id,))
+
+        for result_user_id, personality_type, dimension_scores_json, diagnosed_at in cursor:
+            dimension_scores = [
+                DimensionScore(
+                    dimension=Dimension[score["dimension"]],
+                    first_type=score["first_type"],
+                    second_type=score["second_type"],
+                    first_score=score["first_score"],
+                    second_score=score["second_score"],
+                    dominant_type=score["dominant_type"],
+                    strength_percent=score["strength_percent"],
+                )
+                for score in _load_json(dimension_scores_json)
+            ]
+
+            yield PersonalityResult(
+                user_id=result_user_id,
+                personality_type=personality_type,
                 dimension_scores=dimension_scores,
-                diagnosed_at=_parse_datetime(row["diagnosed_at"]),
+                diagnosed_at=_parse_datetime(diagnosed_at),
             )
-        )
-
-    return results
 
 
-def delete_journal_entry(entry_id: int) -> bool:
+def delete_journal_entry(entry_id: int, user_id: str) -> bool:
     """
     ジャーナルエントリーを削除
 
     Args:
         entry_id: エントリーID
+        user_id: エントリーの持ち主のユーザーID（集計キャッシュの更新に使う）
 
     Returns:
         bool: 削除成功時はTrue
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    try:
-        _execute(cursor, "DELETE FROM journal_entries WHERE id = ?", (entry_id,))
-        conn.commit()
-        deleted = True # Rowcount logic differs, assuming successful exec means true for now
-    except Exception:
-        deleted = False
-    finally:
-        conn.close()
+    with _connection() as conn:
+        cursor = conn.cursor()
+        queries = _queries(conn)
 
+        try:
+            cursor.execute(queries["delete_journal_entry"], (entry_id,))
+            conn.commit()
+            deleted = True # Rowcount logic differs, assuming successful exec means true for now
+        except Exception:
+            # 未確定の変更は release_connection() で巻き戻される
+            deleted = False
+
+    if deleted:
+        _bump_journal_revision(user_id)
     return deleted
 
 
@@ -559,34 +1237,29 @@ def update_journal_entry(entry: JournalEntry) -> bool:
     Returns:
         bool: 更新成功時はTrue
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    query = """
-        UPDATE journal_entries 
-        SET content = ?, tags = ?, emotion_score = ?
-        WHERE id = ?
-    """
-    
-    try:
-        _execute(
-            cursor, 
-            query, 
-            (
-                entry.content,
-                json.dumps(entry.tags, ensure_ascii=False),
-                entry.emotion_score,
-                entry.id
+    with _connection() as conn:
+        cursor = conn.cursor()
+        queries = _queries(conn)
+
+        try:
+            cursor.execute(
+                queries["update_journal_entry"],
+                (
+                    entry.content,
+                    _json_param(conn, entry.tags),
+                    entry.emotion_score,
+                    entry.id
+                )
             )
-        )
-        conn.commit()
-        success = True
-    except Exception as e:
-        print(f"Update error: {e}")
-        success = False
-    finally:
-        conn.close()
-        
+            conn.commit()
+            success = True
+        except Exception as e:
+            # 未確定の変更は release_connection() で巻き戻される
+            print(f"Update error: {e}")
+            success = False
+
+    if success:
+        _bump_journal_revision(entry.user_id)
     return success
 
 
@@ -600,15 +1273,34 @@ def get_all_tags(user_id: str) -> list[str]:
     Returns:
         list[str]: ユニークなタグのリスト（アルファベット順）
     """
-    entries = get_journal_entries(user_id, limit=1000)
-    all_tags = set()
-    
-    for entry in entries:
-        for tag in entry.tags:
-            if tag:
-                all_tags.add(tag)
-    
-    return sorted(list(all_tags))
+    # JSON配列の展開と重複除去はDB側で行う
+    with _connection() as conn:
+        cursor = conn.cursor()
+        queries = _queries(conn)
+
+        cursor.execute(queries["select_all_tags"], (user_id,))
+
+        rows = cursor.fetchall()
+
+    # 並び順はDBの照合順序に依存させず、Python側でそろえる（空のタグはDB側で除外済み）
+    return sorted(row["value"] for row in rows)
+
+
+def _ai_analysis_to_dict(
+    analysis_id: int,
+    user_id: str,
+    analysis_payload: Any,
+    overall_summary: str,
+    analyzed_at: Any,
+) -> dict:
+    """AI分析結果の1行（id, user_id, analysis_payload, overall_summary, analyzed_at）を辞書に変換"""
+    payload = _load_json(analysis_payload)
+    result = {"id": analysis_id, "user_id": user_id}
+    for field in _ANALYSIS_PAYLOAD_FIELDS:
+        result[field] = payload.get(field, [])
+    result["overall_summary"] = overall_summary
+    result["analyzed_at"] = _parse_datetime(analyzed_at)
+    return result
 
 
 def save_ai_analysis_result(
@@ -625,38 +1317,27 @@ def save_ai_analysis_result(
     Returns:
         int: 保存されたレコードのID
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    with _connection() as conn:
+        cursor = conn.cursor()
+        queries = _queries(conn)
 
-    query = """
-        INSERT INTO ai_analysis_results (
-            user_id, behavior_patterns, thinking_patterns, emotional_triggers,
-            values_and_beliefs, strengths, growth_areas, actionable_advice,
-            overall_summary, analyzed_at
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """
-    
-    inserted_id = _execute_and_get_id(conn, cursor, query, (
-            user_id,
-            json.dumps(result_data.get("behavior_patterns", []), ensure_ascii=False),
-            json.dumps(result_data.get("thinking_patterns", []), ensure_ascii=False),
-            json.dumps(result_data.get("emotional_triggers", []), ensure_ascii=False),
-            json.dumps(result_data.get("values_and_beliefs", []), ensure_ascii=False),
-            json.dumps(result_data.get("strengths", []), ensure_ascii=False),
-            json.dumps(result_data.get("growth_areas", []), ensure_ascii=False),
-            json.dumps(result_data.get("actionable_advice", []), ensure_ascii=False),
-            result_data.get("overall_summary", ""),
-            result_data.get("analyzed_at", datetime.now()).isoformat(),
-    ))
-
-    inserted_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+        payload = {field: result_data.get(field, []) for field in _ANALYSIS_PAYLOAD_FIELDS}
 
-    return inserted_id if inserted_id else 0
+        inserted_id = _execute_and_get_id(conn, cursor, queries["insert_ai_analysis_result"], (
+                user_id,
+                _json_param(conn, payload),
+                result_data.get("overall_summary", ""),
+                result_data.get("analyzed_at", datetime.now()),
+        ))
 
+        conn.commit()
 
+    get_latest_ai_analysis.clear()
+    get_user_bundle.clear()
+    return inserted_id
+
+
+@st.cache_data(ttl=60, show_spinner=False)
 def get_latest_ai_analysis(user_id: str) -> dict | None:
     """
     最新のAI分析結果を取得
@@ -667,39 +1348,18 @@ def get_latest_ai_analysis(user_id: str) -> dict | None:
     Returns:
         dict | None: 分析結果（存在しない場合はNone）
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    with _connection() as conn:
+        cursor = _tuple_cursor(conn)
+        queries = _queries(conn)
 
-    _execute(
-        cursor,
-        """
-        SELECT * FROM ai_analysis_results
-        WHERE user_id = ?
-        ORDER BY analyzed_at DESC
-        LIMIT 1
-        """,
-        (user_id,)
-    )
+        cursor.execute(queries["select_latest_ai_analysis"], (user_id,))
 
-    row = cursor.fetchone()
-    conn.close()
+        row = cursor.fetchone()
 
     if row is None:
         return None
 
-    return {
-        "id": row["id"],
-        "user_id": row["user_id"],
-        "behavior_patterns": json.loads(row["behavior_patterns"]),
-        "thinking_patterns": json.loads(row["thinking_patterns"]),
-        "emotional_triggers": json.loads(row["emotional_triggers"]),
-        "values_and_beliefs": json.loads(row["values_and_beliefs"]),
-        "strengths": json.loads(row["strengths"]),
-        "growth_areas": json.loads(row["growth_areas"]),
-        "actionable_advice": json.loads(row["actionable_advice"]),
-        "overall_summary": row["overall_summary"],
-        "analyzed_at": _parse_datetime(row["analyzed_at"]),
-    }
+    return _ai_analysis_to_dict(*row)
 
 
 def save_dynamic_profile(profile: DynamicTypeProfile) -> None:
@@ -709,40 +1369,27 @@ def save_dynamic_profile(profile: DynamicTypeProfile) -> None:
     Args:
         profile: ダイナミック・タイプ・プロファイル
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    with _connection() as conn:
+        cursor = conn.cursor()
+        queries = _queries(conn)
 
-    _execute(
-        cursor,
-        """
-        INSERT INTO dynamic_profiles (
-            user_id, base_type, refined_description, 
-            validated_strengths, observed_challenges, estimated_axis_scores, last_updated
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(user_id) DO UPDATE SET
-            base_type=excluded.base_type,
-            refined_description=excluded.refined_description,
-            validated_strengths=excluded.validated_strengths,
-            observed_challenges=excluded.observed_challenges,
-            estimated_axis_scores=excluded.estimated_axis_scores,
-            last_updated=excluded.last_updated
-        """,
-        (
+        cursor.execute(queries["upsert_dynamic_profile"], (
             profile.user_id,
             profile.base_type,
             profile.refined_description,
-            json.dumps(profile.validated_strengths, ensure_ascii=False),
-            json.dumps(profile.observed_challenges, ensure_ascii=False),
-            json.dumps(profile.estimated_axis_scores, ensure_ascii=False),
-            profile.last_updated.isoformat(),
-        )
-    )
+            _json_param(conn, profile.validated_strengths),
+            _json_param(conn, profile.observed_challenges),
+            _json_param(conn, profile.estimated_axis_scores),
+            profile.last_updated,
+        ))
 
-    conn.commit()
-    conn.close()
+        conn.commit()
+
+    get_dynamic_profile.clear()
+    get_user_bundle.clear()
 
 
+@st.cache_data(ttl=60, show_spinner=False)
 def get_dynamic_profile(user_id: str) -> Optional[DynamicTypeProfile]:
     """
     ダイナミック・タイプ・プロファイルを取得
@@ -753,31 +1400,32 @@ def get_dynamic_profile(user_id: str) -> Optional[DynamicTypeProfile]:
     Returns:
         Optional[DynamicTypeProfile]: プロファイル（存在しない場合はNone）
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    with _connection() as conn:
+        cursor = conn.cursor()
+        queries = _queries(conn)
 
-    _execute(
-        cursor,
-        "SELECT * FROM dynamic_profiles WHERE user_id = ?",
-        (user_id,)
-    )
+        cursor.execute(queries["select_dynamic_profile"], (user_id,))
 
-    row = cursor.fetchone()
-    conn.close()
+        row = cursor.fetchone()
 
     if row is None:
         return None
 
+    return _dynamic_profile_from_row(row)
+
+
+def _dynamic_profile_from_row(row) -> DynamicTypeProfile:
+    """dynamic_profiles の1行（列名でアクセスできる行）を DynamicTypeProfile に変換"""
     estimated_axis_scores = {}
     if "estimated_axis_scores" in row.keys() and row["estimated_axis_scores"]:
-        estimated_axis_scores = json.loads(row["estimated_axis_scores"])
+        estimated_axis_scores = _load_json(row["estimated_axis_scores"])
 
     return DynamicTypeProfile(
         user_id=row["user_id"],
         base_type=row["base_type"],
         refined_description=row["refined_description"],
-        validated_strengths=json.loads(row["validated_strengths"]),
-        observed_challenges=json.loads(row["observed_challenges"]),
+        validated_strengths=_load_json(row["validated_strengths"]),
+        observed_challenges=_load_json(row["observed_challenges"]),
         estimated_axis_scores=estimated_axis_scores,
         last_updated=_parse_datetime(row["last_updated"]),
     )
@@ -794,38 +1442,67 @@ def get_all_ai_analyses(user_id: str, limit: int = 10) -> list[dict]:
     Returns:
         list[dict]: 分析結果のリスト
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    return list(iter_ai_analyses(user_id, limit))
 
-    _execute(
-        cursor,
-        """
-        SELECT * FROM ai_analysis_results
-        WHERE user_id = ?
-        ORDER BY analyzed_at DESC
-        LIMIT ?
-        """,
-        (user_id, limit)
-    )
 
-    rows = cursor.fetchall()
-    conn.close()
+def iter_ai_analyses(user_id: str, limit: int = 10) -> Iterator[dict]:
+    """
+    AI分析結果の履歴を新しい順に1件ずつ取得
+
+    Args:
+        user_id: ユーザーID
+        limit: 取得件数の上限
+
+    Yields:
+        dict: 分析結果
+    """
+    with _connection() as conn:
+        cursor = _stream_cursor(conn, "ai_analysis_history")
+        queries = _queries(conn)
+
+        cursor.execute(queries["select_ai_analysis_history"], (user_id, limit))
 
-    results = []
-    for row in rows:
-        results.append({
-            "id": row["id"],
-            "user_id": row["user_id"],
-            "behavior_patterns": json.loads(row["behavior_patterns"]),
-            "thinking_patterns": json.loads(row["thinking_patterns"]),
-            "emotional_triggers": json.loads(row["emotional_triggers"]),
-            "values_and_beliefs": json.loads(row["values_and_beliefs"]),
-            "strengths": json.loads(row["strengths"]),
-            "growth_areas": json.loads(row["growth_areas"]),
-            "actionable_advice": json.loads(row["actionable_advice"]),
-            "overall_summary": row["overall_summary"],
-            "analyzed_at": _parse_datetime(row["analyzed_at"]),
-        })
-
-    return results
+        for row in cursor:
+            yield _ai_analysis_to_dict(*row)
 
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_user_bundle(user_id: str, journal_limit: int = 50) -> dict:
+    """
+    最新の性格診断結果・最新のAI分析結果・ダイナミックプロファイル・直近のジャーナルを1つの接続でまとめて取得
+
+    Args:
+        user_id: ユーザーID
+        journal_limit: 取得するジャーナルの件数上限
+
+    Returns:
+        dict: {"personality": PersonalityResult | None,
+               "analysis": dict | None,
+               "profile": DynamicTypeProfile | None,
+               "journals": list[JournalEntry]（新しい順）}
+    """
+    with _connection() as conn:
+        cursor = conn.cursor()
+        queries = _queries(conn)
+
+        cursor.execute(queries["select_latest_personality"], (user_id,))
+        personality_row = cursor.fetchone()
+
+        cursor.execute(queries["select_dynamic_profile"], (user_id,))
+        profile_row = cursor.fetchone()
+
+        # AI分析結果は位置でアンパックするためタプルを返すカーソルで取得
+        analysis_cursor = _tuple_cursor(conn)
+        analysis_cursor.execute(queries["select_latest_ai_analysis"], (user_id,))
+        analysis_row = analysis_cursor.fetchone()
+
+        journal_cursor = _tuple_cursor(conn)
+        journal_cursor.execute(queries["select_journal_entries"], (user_id, journal_limit))
+        journals = _journal_entries_from_cursor(journal_cursor)
+
+    return {
+        "personality": _personality_result_from_row(personality_row) if personality_row else None,
+        "analysis": _ai_analysis_to_dict(*analysis_row) if analysis_row else None,
+        "profile": _dynamic_profile_from_row(profile_row) if profile_row else None,
+        "journals": journals,
+    }
@@ -5,22 +5,42 @@ Google Gemini APIを使用してジャーナル内容を深く分析し、
 ユーザーの人間性に関するインサイトを提供します。
 """
 
+import asyncio
+import concurrent.futures
+import hashlib
+import heapq
+import json
 import os
+import threading
 from datetime import datetime
-from typing import Optional
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Awaitable, Iterator, Optional
 
+import numpy as np
 from dotenv import load_dotenv
-from dotenv import load_dotenv
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 import streamlit as st
 
+try:
+    from google import genai
+    from google.genai import types as genai_types
+except ImportError:
+    genai = None
+    genai_types = None
 
 from database.db_manager import get_dynamic_profile, save_dynamic_profile
+from logic import llm_cache
 from models.data_models import DynamicTypeProfile, JournalEntry, get_jst_now
 
 # 環境変数を読み込み
 load_dotenv()
 
+# 使用するモデル
+# 短く件数の多い日記フィードバックは軽量モデル、分析・プロフィール生成は標準モデルを使う
+FEEDBACK_MODEL = "gemini-flash-lite-latest"
+ANALYSIS_MODEL = "gemini-flash-latest"
+
 
 class AIAnalysisResult(BaseModel):
     """AI分析結果"""
@@ -62,39 +82,429 @@ class AIAnalysisResult(BaseModel):
     )
 
 
-def get_gemini_client() -> Optional[object]:
+class AIAnalysisResponse(BaseModel):
     """
-    Gemini APIクライアントを取得
-    
+    AI分析のレスポンススキーマ（Geminiの構造化出力で使用）
+
+    出力トークンを減らすため、JSONのキーは短い別名（alias）にしている
+    """
+    behavior_patterns: list[str] = Field(alias="bp", description="日記から読み取れる具体的な行動パターン（3-4個）")
+    thinking_patterns: list[str] = Field(alias="tp", description="思考・判断の傾向（3-4個）")
+    emotional_triggers: list[str] = Field(alias="et", description="喜び・ストレスの具体的なトリガー（3-4個）")
+    values_and_beliefs: list[str] = Field(alias="vb", description="大切にしている価値観（3-4個）")
+    strengths: list[str] = Field(alias="s", description="強み・才能。できれば本人が気づいていなさそうなもの（3-4個）")
+    growth_areas: list[str] = Field(alias="ga", description="成長の余地。批判ではなく可能性として（2-3個）")
+    actionable_advice: list[str] = Field(alias="aa", description="明日から実践できる具体的なアクション（3個）")
+    overall_summary: str = Field(alias="sum", description="この人の魅力と可能性を温かく表現したサマリー（200-300文字）")
+
+
+class FeedbackItem(BaseModel):
+    """一括フィードバックの1件分"""
+    id: int = Field(description="日記の番号")
+    text: str = Field(description="その日記へのフィードバックメッセージ")
+
+
+class BatchFeedbackResponse(BaseModel):
+    """一括フィードバックのレスポンススキーマ（Geminiの構造化出力で使用）"""
+    feedbacks: list[FeedbackItem]
+
+
+class AxisScores(BaseModel):
+    """4指標の推定傾向（0.0: E/S/T/J 寄り 〜 1.0: I/N/F/P 寄り）"""
+    EI: float
+    SN: float
+    TF: float
+    JP: float
+
+
+class ProfileResponse(BaseModel):
+    """ダイナミック・プロファイル生成のレスポンススキーマ（Geminiの構造化出力で使用、キーは短い別名）"""
+    refined_description: str = Field(alias="rd", description="詳細な人物像説明。三人称（このユーザーは...）で記述")
+    validated_strengths: list[str] = Field(alias="vs", description="日記で確認された具体的な強み（5-7個）")
+    observed_challenges: list[str] = Field(alias="oc", description="日記で確認された具体的な課題（5-7個）")
+    estimated_axis_scores: AxisScores = Field(alias="eas", description="日記から推定した4指標の現在の傾向")
+
+
+@lru_cache(maxsize=1)
+def _resolve_api_key() -> Optional[str]:
+    """
+    Gemini APIキーを取得（環境変数 → Streamlit Secrets の順、結果はプロセス内で使い回す）
+
     Returns:
-        クライアントオブジェクト（設定されていない場合はNone）
+        APIキー（設定されていない場合はNone）
     """
     api_key = os.getenv("GEMINI_API_KEY")
-    
+
     # Streamlit CloudのSecretsも確認
     if (not api_key or api_key == "your_api_key_here") and hasattr(st, "secrets") and "GEMINI_API_KEY" in st.secrets:
         api_key = st.secrets["GEMINI_API_KEY"]
-    
+
     if not api_key or api_key == "your_api_key_here":
         return None
-    
-    try:
-        from google import genai
-        client = genai.Client(api_key=api_key)
-        return client
-    except ImportError:
+    return api_key
+
+
+@lru_cache(maxsize=None)
+def _create_client(api_key: str) -> Optional[object]:
+    """
+    APIキーごとにクライアントを1度だけ生成して使い回す
+    （内部のHTTP接続プールも再利用される）
+    """
+    if genai is None:
         return None
+    try:
+        return genai.Client(api_key=api_key)
     except Exception:
         return None
 
 
+def _invalidate_client() -> None:
+    """キャッシュ済みのAPIキーとクライアントを破棄（認証エラー時に使用）"""
+    _resolve_api_key.cache_clear()
+    _create_client.cache_clear()
+
+
+def _handle_api_error(error: Exception) -> None:
+    """API呼び出しのエラー処理（認証エラーならクライアントを作り直させる）"""
+    if getattr(error, "code", None) in (401, 403):
+        _invalidate_client()
+
+
+# 非同期API呼び出しを実行するイベントループ（バックグラウンドスレッドで常駐）
+# クライアントの非同期HTTP接続プールはイベントループに紐づくため、
+# 呼び出しごとに asyncio.run で新しいループを作らず同じループを使い続ける
+_event_loop: Optional[asyncio.AbstractEventLoop] = None
+_event_loop_lock = threading.Lock()
+
+
+def _get_event_loop() -> asyncio.AbstractEventLoop:
+    """API呼び出し用のイベントループを取得（初回のみスレッドを起動）"""
+    global _event_loop
+    with _event_loop_lock:
+        if _event_loop is None:
+            _event_loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_event_loop.run_forever,
+                name="gemini-event-loop",
+                daemon=True,
+            ).start()
+    return _event_loop
+
+
+def _run_sync(coro: Awaitable[Any]) -> Any:
+    """コルーチンをAPI呼び出し用のイベントループで実行し、完了まで待って結果を返す"""
+    return asyncio.run_coroutine_threadsafe(coro, _get_event_loop()).result()
+
+
+def run_in_background(coro: Awaitable[Any]) -> concurrent.futures.Future:
+    """
+    a_* 関数をAPI呼び出し用のイベントループで開始し、完了を待たずにFutureを返す
+
+    例:
+        future = run_in_background(a_refine_profile_with_journal(user_id, ptype, entry))
+        ...（他の処理）...
+        profile, error = future.result()
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_event_loop())
+
+
+def run_concurrently(*coros: Awaitable[Any], return_exceptions: bool = False) -> list[Any]:
+    """
+    複数の a_* 関数を同時に実行し、すべての結果を引数の順に返す
+
+    Args:
+        *coros: 実行するコルーチン
+        return_exceptions: Trueの場合、例外を送出せず結果のリストに例外オブジェクトを入れて返す
+
+    例:
+        (feedback, _), (profile, _) = run_concurrently(
+            a_get_journal_feedback(content, score, ptype),
+            a_refine_profile_with_journal(user_id, ptype, entry),
+        )
+    """
+    async def _gather() -> list[Any]:
+        return await asyncio.gather(*coros, return_exceptions=return_exceptions)
+
+    return _run_sync(_gather())
+
+
+@lru_cache(maxsize=None)
+def _schema_fingerprint(schema: type[BaseModel]) -> str:
+    """レスポンススキーマのJSONスキーマから短い識別子を生成（キャッシュキー用）"""
+    schema_json = json.dumps(schema.model_json_schema(), sort_keys=True)
+    return hashlib.blake2b(schema_json.encode(), digest_size=4).hexdigest()
+
+
+async def _generate_text(
+    client: Any,
+    prompt: str,
+    model: str = ANALYSIS_MODEL,
+    use_cache: bool = True,
+    cache_write: bool = True,
+    response_schema: Optional[type[BaseModel]] = None,
+    system_instruction: Optional[str] = None,
+) -> str:
+    """
+    プロンプトを送信してレスポンステキストを取得
+
+    同じモデル・同じプロンプトの結果はキャッシュから返し、API呼び出しを省略する。
+
+    Args:
+        client: Gemini APIクライアント
+        prompt: プロンプト（日記などの可変部分）
+        model: モデル名
+        use_cache: キャッシュ済みの結果を使うかどうか（Falseでも結果はキャッシュに保存し直す）
+        cache_write: 結果をキャッシュに保存するかどうか（再利用しない応答はディスクに残さない）
+        response_schema: 指定した場合、このスキーマに沿ったJSONを返させる（構造化出力）
+        system_instruction: システム指示（固定の指示文）
+
+    Returns:
+        レスポンステキスト
+    """
+    config_kwargs: dict[str, Any] = {}
+    cache_model = model
+    if system_instruction:
+        config_kwargs["system_instruction"] = system_instruction
+    if response_schema is not None:
+        config_kwargs["response_mime_type"] = "application/json"
+        config_kwargs["response_schema"] = response_schema
+        # 同じプロンプトでも出力形式が異なるためキーを分ける（スキーマ変更時も別キーになる）
+        cache_model = f"{model}:{response_schema.__name__}:{_schema_fingerprint(response_schema)}"
+
+    key = llm_cache.make_key(cache_model, prompt, system_instruction)
+    if use_cache:
+        cached = llm_cache.get_cached_response(key)
+        if cached is not None:
+            return cached
+
+    response = await client.aio.models.generate_content(
+        model=model,
+        contents=prompt,
+        config=genai_types.GenerateContentConfig(**config_kwargs) if config_kwargs else None,
+    )
+    text = response.text or ""
+    if text and cache_write:
+        llm_cache.set_cached_response(key, text)
+    return text
+
+
+def _stream_text(
+    client: Any,
+    prompt: str,
+    model: str = ANALYSIS_MODEL,
+    use_cache: bool = True,
+    cache_write: bool = True,
+    system_instruction: Optional[str] = None,
+) -> Iterator[str]:
+    """
+    プロンプトを送信し、レスポンステキストを生成された部分から順に返す（ストリーミング）
+
+    全文の生成を待たずに表示を始められるため、自由記述のレスポンスで使用する。
+    キャッシュ済みの場合は全文を1度に返す。
+
+    Args:
+        client: Gemini APIクライアント
+        prompt: プロンプト（日記などの可変部分）
+        model: モデル名
+        use_cache: キャッシュ済みの結果を使うかどうか（Falseでも結果はキャッシュに保存し直す）
+        cache_write: 結果をキャッシュに保存するかどうか（再利用しない応答はディスクに残さない）
+        system_instruction: システム指示（固定の指示文）
+
+    Yields:
+        レスポンステキストの断片
+    """
+    key = llm_cache.make_key(model, prompt, system_instruction)
+    if use_cache:
+        cached = llm_cache.get_cached_response(key)
+        if cached is not None:
+            yield cached
+            return
+
+    config = (
+        genai_types.GenerateContentConfig(system_instruction=system_instruction)
+        if system_instruction
+        else None
+    )
+    chunks: list[str] = []
+    try:
+        for chunk in client.models.generate_content_stream(
+            model=model,
+            contents=prompt,
+            config=config,
+        ):
+            if chunk.text:
+                chunks.append(chunk.text)
+                yield chunk.text
+    except Exception as e:
+        _handle_api_error(e)
+        raise
+
+    text = "".join(chunks)
+    if text and cache_write:
+        llm_cache.set_cached_response(key, text)
+
+
+# 日記テキストの入力トークン数の上限
+JOURNALS_TOKEN_BUDGET = 30000
+
+
+async def _fit_to_budget(
+    client: Any,
+    parts: list[str],
+    model: str = ANALYSIS_MODEL,
+    budget: int = JOURNALS_TOKEN_BUDGET,
+) -> str:
+    """
+    日記ごとのテキストを結合し、トークン数が上限を超える場合は古い日記から削る
+
+    Args:
+        client: Gemini APIクライアント
+        parts: 日記ごとのテキスト（新しい順）
+        model: トークン数を数えるモデル名
+        budget: トークン数の上限
+
+    Returns:
+        上限内に収めた日記テキスト
+    """
+    text = "".join(parts)
+    # 日本語の日記はおおむね1文字1トークン以下のため、文字数が上限内ならAPIで数えない
+    if len(text) <= budget:
+        return text
+
+    kept = list(parts)
+    while True:
+        try:
+            response = await client.aio.models.count_tokens(model=model, contents=text)
+            total_tokens = response.total_tokens
+        except Exception:
+            # 数えられない場合は文字数で見積もる
+            total_tokens = len(text)
+        if total_tokens <= budget:
+            return text
+
+        # 1文字あたりのトークン数から、上限に収まるまで古い日記を落とす
+        tokens_per_char = total_tokens / len(text)
+        length = len(text)
+        while len(kept) > 1 and length * tokens_per_char > budget:
+            length -= len(kept.pop())
+        text = "".join(kept)
+
+        if len(kept) == 1 and len(text) * tokens_per_char > budget:
+            # 最新の1件だけでも上限を超える場合は末尾を切り詰める
+            return text[: int(budget / tokens_per_char)]
+
+
+# すべてのAI呼び出しで共通のシステム指示
+# 固定の指示文は system_instruction として送り、毎回のプロンプトには日記などの可変部分だけを入れる
+# （同じ先頭部分が続くため、Gemini側のコンテキストキャッシュにも乗りやすくなる）
+SYSTEM_INSTRUCTION = """あなたは経験豊富な臨床心理士であり、性格分析の専門家です。
+ユーザーの日記を読み、その人の内面について温かく、かつ鋭い洞察を自然な日本語で提供します。
+- 日記に書かれた具体的なエピソードを根拠にし、一般論・抽象論・表面的なお世辞は避ける
+- 批判や説教ではなく、成長と可能性の視点で書く"""
+
+# 日記の総合分析（analyze_journals_with_ai）
+_ANALYSIS_INSTRUCTION = f"""{SYSTEM_INSTRUCTION}
+
+【タスク】
+日記の「行間」を読み、その人だけに当てはまる具体的な内容で人間性を分析してください。
+視点: 行動と思考のパターン（書かれていない習慣の推測も含む）、喜びとストレスの源泉、
+無意識の価値観と本人が気づいていない強み、性格タイプを活かした成長の可能性、明日から小さく始められる行動。
+性格タイプが示された場合は、タイプの一般的な特徴と日記から見える実像の一致点・意外な点を比較してください。"""
+
+# 1件の日記への即時フィードバック（get_journal_feedback）
+_FEEDBACK_INSTRUCTION = f"""{SYSTEM_INSTRUCTION}
+
+【タスク】
+今日の日記に、心に響くフィードバックを書いてください。
+1. 日記の内容に共感を示す
+2. ポジティブな点や気づきを1つ具体的に指摘する
+3. すぐに実践できる小さな提案を1つだけする
+
+【出力形式】
+180〜220文字。「〜ですね」「〜かもしれませんね」など寄り添う表現で、絵文字は使わない。
+フィードバックメッセージのみを返してください。"""
+
+# 複数の日記への一括フィードバック（batch_get_journal_feedback）
+_BATCH_FEEDBACK_INSTRUCTION = f"""{SYSTEM_INSTRUCTION}
+
+【タスク】
+番号付きの複数の日記それぞれに、心に響くフィードバックを書いてください。
+各日記について、共感を示し、ポジティブな点を1つ具体的に指摘し、すぐ実践できる小さな提案を1つだけしてください。
+気分スコアに応じてトーンを調整してください。
+- 3以下: 労いの言葉を中心に、無理にポジティブにせず気持ちに寄り添う
+- 4〜5: 日常の中の小さな良い点を見つけ、穏やかなトーンで
+- 6〜7: ポジティブな点を一緒に喜び、良い状態を続けるヒントを
+- 8以上: 喜びを分かち合い、良い気分につながった要因に触れる
+
+【出力形式】
+各日記につき1件、番号（id）を付けて返す。1件あたり180〜220文字。
+「〜ですね」「〜かもしれませんね」など寄り添う表現で、絵文字は使わない。"""
+
+# 週間インサイト（get_weekly_insight）
+_WEEKLY_INSIGHT_INSTRUCTION = f"""{SYSTEM_INSTRUCTION}
+
+【タスク】
+1週間の日記と感情データを振り返り、深い洞察と温かい励ましを書いてください。
+視点: 感情の流れ（どんな時に上がり、どんな時に下がったか）、繰り返し現れるテーマ、
+小さな成長や良い変化、来週をより良くする具体的な提案。性格タイプが示された場合はその特徴を踏まえてください。
+
+【出力形式】
+合計300〜400文字で、次の見出しを使ってください。
+
+📊 **今週の振り返り**
+（1週間の感情の流れと主なテーマを2-3文で）
+
+✨ **見つけた光**
+（今週の良かった点、成長を1-2文で）
+
+💡 **気づき**
+（深い洞察や発見を1-2文で）
+
+🌱 **来週へのヒント**
+（具体的で実践しやすい提案を1-2つ。その人の性格に合った形で）"""
+
+# ダイナミック・プロファイル生成で共通の指示
+_PROFILE_INSTRUCTION_BASE = f"""{SYSTEM_INSTRUCTION}
+
+【タスク】
+基本性格タイプの枠組みを使いつつ、一般的なタイプの説明ではなく、
+日記のエビデンスに基づいてこのユーザー独自の特徴・価値観・行動パターンを描いた「生きた」人物像を作成してください。
+強みと課題は、日記の中で具体的に現れているものを挙げてください。
+4つの指標（EI, SN, TF, JP）の現在の実際の傾向を日記から0.0〜1.0で推定してください
+（0.0に近いほど E/S/T/J、1.0に近いほど I/N/F/P、0.5は中立）。"""
+
+# 全日記からのプロフィール生成（generate_comprehensive_profile）
+_COMPREHENSIVE_PROFILE_INSTRUCTION = f"""{_PROFILE_INSTRUCTION_BASE}
+過去の日記ログからプロフィールをゼロから作成し、人物像説明（rd）は400-500文字にしてください。"""
+
+# 新しい日記によるプロフィール更新（refine_profile_with_journal）
+_REFINE_PROFILE_INSTRUCTION = f"""{_PROFILE_INSTRUCTION_BASE}
+現在のプロフィールを維持しつつ、新しい日記から分かったことを統合して洗練させてください。
+人物像説明（rd）は300-400文字、強み・課題はそれぞれ最大5-7個にしてください。"""
+
+
+def get_gemini_client() -> Optional[object]:
+    """
+    Gemini APIクライアントを取得
+    
+    Returns:
+        クライアントオブジェクト（設定されていない場合はNone）
+    """
+    api_key = _resolve_api_key()
+    if api_key is None:
+        return None
+    return _create_client(api_key)
+
+
 def build_analysis_prompt(
     journals_text: str,
     personality_type: Optional[str] = None,
     emotion_stats: Optional[dict[str, float]] = None,
 ) -> str:
     """
-    AI分析用のプロンプトを構築
+    AI分析用のプロンプト（性格タイプ・感情統計・日記）を構築
+
+    分析の指示は _ANALYSIS_INSTRUCTION としてシステム指示で送る
     
     Args:
         journals_text: ジャーナルエントリーのテキスト
@@ -102,84 +512,20 @@ def build_analysis_prompt(
         emotion_stats: 感情統計情報（あれば）
     
     Returns:
-        構造化されたプロンプト
+        プロンプト
     """
-    personality_context = ""
+    sections = []
     if personality_type:
-        personality_context = f"""【性格タイプ】
-このユーザーの性格診断結果は「{personality_type}」です。
-性格タイプの一般的な特徴と、日記から見える実際の姿を比較し、
-一致している点、意外な点、成長の可能性を見出してください。"""
+        sections.append(f"【性格タイプ】{personality_type}")
 
-    emotion_context = ""
     if emotion_stats:
-        emotion_context = f"""【感情の傾向】
+        sections.append(f"""【感情の傾向】
 - 平均気分スコア: {emotion_stats.get('avg', 0):.1f}/10
 - 最高: {emotion_stats.get('max', 0)}/10、最低: {emotion_stats.get('min', 0)}/10
-- 変動幅: {emotion_stats.get('range', 0)}
-これらの傾向も考慮に入れてください。"""
-
-    prompt = f"""あなたは20年以上の経験を持つ臨床心理士であり、人間の内面を深く理解する専門家です。
-クライアントが書いた日記を読み、その方の人間性について温かく、かつ鋭い洞察を提供してください。
-
-{personality_context}
-{emotion_context}
-
-【分析対象の日記】
-{journals_text}
-
-【分析の視点 - 深さを重視】
-
-表面的なキーワード抽出ではなく、日記の「行間」を読んでください。
-以下の5つの視点から、具体的かつ深い洞察を提供してください：
-
-1. **行動と思考のパターン**
-   - 繰り返し現れるテーマや行動傾向
-   - 意思決定の仕方、問題への向き合い方
-   - 日記に書かれていないが推測される習慣
-
-2. **感情の源泉**
-   - 何がこの人を本当に喜ばせるか
-   - ストレスや不安の根本にあるもの
-   - 感情と行動の関係性
-
-3. **価値観と強み**
-   - 無意識に大切にしているもの
-   - 本人が気づいていない潜在的な才能
-   - 人柄の魅力的な側面
-
-4. **成長のチャンス**
-   - より幸せになれる可能性のある領域
-   - 批判ではなく、可能性としての提案
-   - 性格タイプを活かした成長の方向性
-
-5. **明日からのアクション**
-   - 小さく始められる具体的な一歩
-   - この人の性格に合った実践方法
-   - 継続しやすい形での提案
-
-【回答形式】
-必ず以下のJSON形式で回答してください。
-各項目は「具体的」で「その人だけに当てはまる」内容にしてください。
-一般論や抽象的な表現は避けてください。
-
-```json
-{{
-    "behavior_patterns": ["日記から読み取れる具体的なパターン（3-4個）"],
-    "thinking_patterns": ["思考・判断の傾向（3-4個）"],
-    "emotional_triggers": ["喜び・ストレスの具体的なトリガー（3-4個）"],
-    "values_and_beliefs": ["大切にしている価値観（3-4個）"],
-    "strengths": ["強み・才能。できれば本人が気づいていなさそうなもの（3-4個）"],
-    "growth_areas": ["成長の余地。批判ではなく可能性として（2-3個）"],
-    "actionable_advice": ["明日から実践できる具体的なアクション（3個）"],
-    "overall_summary": "200-300文字で、この人の魅力と可能性を温かく表現してください"
-}}
-```
-
-【重要な注意点】
-- 温かみを持ちながらも、表面的なお世辞は避けてください
-- 批判や否定ではなく、常に成長と可能性の視点で書いてください
-- 日記に書かれた具体的なエピソードを根拠にしてください"""
+- 変動幅: {emotion_stats.get('range', 0)}""")
+
+    sections.append(f"【分析対象の日記】\n{journals_text}")
+    prompt = "\n\n".join(sections)
 
     return prompt
 
@@ -194,32 +540,14 @@ def parse_ai_response(response_text: str) -> AIAnalysisResult:
     Returns:
         AIAnalysisResult オブジェクト
     """
-    import json
-    import re
-    
-    # JSONブロックを抽出
-    json_match = re.search(r'```json\s*(.*?)\s*```', response_text, re.DOTALL)
-    
-    if json_match:
-        json_str = json_match.group(1)
-    else:
-        # JSONブロックがない場合、全体をJSONとして解析を試みる
-        json_str = response_text
-    
+    # 構造化出力（AIAnalysisResponse）のJSONをそのまま検証・変換する
     try:
-        data = json.loads(json_str)
+        data = AIAnalysisResponse.model_validate_json(response_text)
         return AIAnalysisResult(
-            behavior_patterns=data.get("behavior_patterns", []),
-            thinking_patterns=data.get("thinking_patterns", []),
-            emotional_triggers=data.get("emotional_triggers", []),
-            values_and_beliefs=data.get("values_and_beliefs", []),
-            strengths=data.get("strengths", []),
-            growth_areas=data.get("growth_areas", []),
-            actionable_advice=data.get("actionable_advice", []),
-            overall_summary=data.get("overall_summary", ""),
+            **data.model_dump(),
             analyzed_at=get_jst_now(),
         )
-    except (json.JSONDecodeError, KeyError):
+    except ValidationError:
         # パースに失敗した場合はデフォルト値を返す
         return AIAnalysisResult(
             overall_summary="分析結果のパースに失敗しました。再度お試しください。",
@@ -230,6 +558,18 @@ def parse_ai_response(response_text: str) -> AIAnalysisResult:
 def analyze_journals_with_ai(
     journals: list,
     personality_type: Optional[str] = None,
+    use_cache: bool = True,
+) -> tuple[Optional[AIAnalysisResult], Optional[str]]:
+    """
+    ジャーナルをAIで分析する（a_analyze_journals_with_ai の同期版）
+    """
+    return _run_sync(a_analyze_journals_with_ai(journals, personality_type, use_cache))
+
+
+async def a_analyze_journals_with_ai(
+    journals: list,
+    personality_type: Optional[str] = None,
+    use_cache: bool = True,
 ) -> tuple[Optional[AIAnalysisResult], Optional[str]]:
     """
     ジャーナルをAIで分析する
@@ -237,6 +577,7 @@ def analyze_journals_with_ai(
     Args:
         journals: JournalEntryのリスト
         personality_type: 性格タイプ（あれば）
+        use_cache: Falseの場合はキャッシュ済みの結果を使わずに再分析する（結果はキャッシュに保存し直す）
     
     Returns:
         (AIAnalysisResult, エラーメッセージ) のタプル
@@ -252,17 +593,20 @@ def analyze_journals_with_ai(
         return None, "分析するジャーナルがありません。先に日記を書いてください。"
     
     # ジャーナルをテキストに変換
-    journals_text = ""
+    parts: list[str] = []
     for journal in journals:
-        date_str = journal.date.strftime("%Y年%m月%d日")
+        date = journal.date
+        date_str = f"{date.year}年{date.month:02d}月{date.day:02d}日"
         emotion_str = f"気分: {journal.emotion_score}/10"
         tags_str = f"タグ: {', '.join(journal.tags)}" if journal.tags else ""
         
-        journals_text += f"""
+        parts.append(f"""
 ---
 【{date_str}】{emotion_str} {tags_str}
 {journal.content}
-"""
+""")
+    # 上限を超える場合は古い日記から削る（journals は新しい順）
+    journals_text = await _fit_to_budget(client, parts)
     
     # 感情統計を計算
     emotion_stats = calculate_emotion_stats(journals)
@@ -272,16 +616,20 @@ def analyze_journals_with_ai(
     
     try:
         # Gemini APIを呼び出し
-        response = client.models.generate_content(
-            model="gemini-flash-latest",
-            contents=prompt,
+        response_text = await _generate_text(
+            client,
+            prompt,
+            use_cache=use_cache,
+            response_schema=AIAnalysisResponse,
+            system_instruction=_ANALYSIS_INSTRUCTION,
         )
         
         # レスポンスをパース
-        result = parse_ai_response(response.text)
+        result = parse_ai_response(response_text)
         return result, None
         
     except Exception as e:
+        _handle_api_error(e)
         error_msg = f"AI分析中にエラーが発生しました: {str(e)}"
         return None, error_msg
 
@@ -293,17 +641,24 @@ def is_api_configured() -> bool:
     Returns:
         設定されている場合True
     """
-    api_key = os.getenv("GEMINI_API_KEY")
-    if (not api_key or api_key == "your_api_key_here") and hasattr(st, "secrets") and "GEMINI_API_KEY" in st.secrets:
-        api_key = st.secrets["GEMINI_API_KEY"]
-        
-    return bool(api_key and api_key != "your_api_key_here")
+    return _resolve_api_key() is not None
 
 
 def get_journal_feedback(
     content: str,
     emotion_score: int,
     personality_type: Optional[str] = None,
+) -> tuple[Optional[str], Optional[str]]:
+    """
+    ジャーナル入力に対する即時AIフィードバックを取得（a_get_journal_feedback の同期版）
+    """
+    return _run_sync(a_get_journal_feedback(content, emotion_score, personality_type))
+
+
+async def a_get_journal_feedback(
+    content: str,
+    emotion_score: int,
+    personality_type: Optional[str] = None,
 ) -> tuple[Optional[str], Optional[str]]:
     """
     ジャーナル入力に対する即時AIフィードバックを取得
@@ -324,145 +679,162 @@ def get_journal_feedback(
     if not content or len(content.strip()) < 20:
         return None, None  # 内容が短すぎる場合はスキップ
     
+    prompt = _build_feedback_prompt(content, emotion_score, personality_type)
+
+    try:
+        response_text = await _generate_text(
+            client,
+            prompt,
+            model=FEEDBACK_MODEL,
+            use_cache=False,
+            cache_write=False,
+            system_instruction=_FEEDBACK_INSTRUCTION,
+        )
+        return response_text.strip(), None
+    except Exception as e:
+        _handle_api_error(e)
+        return None, str(e)
+
+
+def stream_journal_feedback(
+    content: str,
+    emotion_score: int,
+    personality_type: Optional[str] = None,
+) -> tuple[Optional[Iterator[str]], Optional[str]]:
+    """
+    ジャーナル入力に対する即時AIフィードバックを、生成された部分から順に取得
+
+    Args:
+        content: ジャーナルの内容
+        emotion_score: 感情スコア（1-10）
+        personality_type: 性格タイプ（あれば）
+
+    Returns:
+        (フィードバックの断片を返すイテレータ, エラーメッセージ) のタプル
+        API未設定・内容が短すぎる場合はどちらもNone
+        API呼び出しのエラーはイテレータの読み出し中に送出される
+    """
+    client = get_gemini_client()
+
+    if client is None:
+        return None, None  # APIが設定されていなくてもエラーにしない
+
+    if not content or len(content.strip()) < 20:
+        return None, None  # 内容が短すぎる場合はスキップ
+
+    prompt = _build_feedback_prompt(content, emotion_score, personality_type)
+    stream = _stream_text(
+        client,
+        prompt,
+        model=FEEDBACK_MODEL,
+        use_cache=False,
+        cache_write=False,
+        system_instruction=_FEEDBACK_INSTRUCTION,
+    )
+    return stream, None
+
+
+def _build_feedback_prompt(
+    content: str,
+    emotion_score: int,
+    personality_type: Optional[str],
+) -> str:
+    """即時フィードバック用のプロンプト（クライアント情報・トーン・日記）を構築"""
     # 性格タイプ別のパーソナライズされたアプローチ
     personality_guidance = _get_personality_feedback_guidance(personality_type)
-    
+
     # 感情状態に応じたトーン調整
     emotion_tone = _get_emotion_aware_tone(emotion_score)
-    
-    prompt = f"""あなたは豊かな経験を持つ心理カウンセラーです。
-クライアントの日記を読み、心に響く温かいフィードバックを提供してください。
 
-【クライアント情報】
+    return f"""【クライアント情報】
 - 性格タイプ: {personality_type if personality_type else '未診断'}
 - 今日の気分: {emotion_score}/10
 {personality_guidance}
 
-【今日の日記】
-{content}
-
-【フィードバック作成の指針】
 {emotion_tone}
 
-1. **共感と承認**: まず日記の内容に対する共感を示してください
-2. **具体的な気づき**: 日記の中から1つ、ポジティブな点や気づきを具体的に指摘してください
-3. **明日へのヒント**: 1つだけ、すぐに実践できる小さな提案をしてください
-
-【出力形式】
-- 180〜220文字程度
-- 温かみのある自然な日本語
-- 「〜ですね」「〜かもしれませんね」など寄り添う表現を使用
-- 相手を否定したり、説教をしたりしない
-- 絵文字は使わない
+【今日の日記】
+{content}"""
 
-フィードバックメッセージのみを返してください。"""
 
-    try:
-        response = client.models.generate_content(
-            model="gemini-flash-latest",
-            contents=prompt,
-        )
-        return response.text.strip(), None
-    except Exception as e:
-        return None, str(e)
+def batch_get_journal_feedback(
+    entries: list[tuple[str, int]],
+    personality_type: Optional[str] = None,
+) -> tuple[list[Optional[str]], Optional[str]]:
+    """
+    複数のジャーナルへのフィードバックを1回のAPI呼び出しでまとめて取得
+    （a_batch_get_journal_feedback の同期版）
+    """
+    return _run_sync(a_batch_get_journal_feedback(entries, personality_type))
 
 
-def generate_comprehensive_profile(
-    user_id: str,
-    base_type: str,
-    journals: list[JournalEntry],
-) -> tuple[Optional[DynamicTypeProfile], Optional[str]]:
+async def a_batch_get_journal_feedback(
+    entries: list[tuple[str, int]],
+    personality_type: Optional[str] = None,
+) -> tuple[list[Optional[str]], Optional[str]]:
     """
-    全ジャーナルに基づいて包括的なプロフィールを生成する（一括更新用）
+    複数のジャーナルへのフィードバックを1回のAPI呼び出しでまとめて取得
+
+    指示文を1度だけ送り、日記を番号付きで並べることで、
+    1件ずつ呼び出す場合よりも入力トークンを節約する（過去分の再生成などに使用）。
 
     Args:
-        user_id: ユーザーID
-        base_type: 基本性格タイプ
-        journals: ジャーナルエントリーのリスト
+        entries: (ジャーナルの内容, 感情スコア) のリスト
+        personality_type: 性格タイプ（あれば）
 
     Returns:
-        (NewProfile, ErrorMessage)
+        (entries と同じ順のフィードバックのリスト, エラーメッセージ) のタプル
+        内容が短すぎる日記や、返答に含まれなかった日記のフィードバックはNone
     """
+    feedbacks: list[Optional[str]] = [None] * len(entries)
+
     client = get_gemini_client()
     if client is None:
-        return None, "APIキーが設定されていません"
+        return feedbacks, "APIキーが設定されていません"
 
-    if not journals:
-        return None, "分析するジャーナルがありません"
+    # 内容が短すぎるものは単体のフィードバックと同様にスキップ
+    targets = [
+        (i, content.strip(), emotion_score)
+        for i, (content, emotion_score) in enumerate(entries)
+        if content and len(content.strip()) >= 20
+    ]
+    if not targets:
+        return feedbacks, None
 
-    # ジャーナルをテキストに変換（最新のものから最大20件程度を使用）
-    # トークン数を考慮して、内容を結合
-    sorted_journals = sorted(journals, key=lambda j: j.date, reverse=True)[:30]
-    journals_text = ""
-    for journal in sorted_journals:
-        date_str = journal.date.strftime("%Y/%m/%d")
-        journals_text += f"\n--- {date_str} ---\n{journal.content}\n"
-
-    prompt = f"""あなたは性格分析の専門家です。
-ユーザーの基本性格タイプは「{base_type}」です。
-以下の過去の日記ログ（最大30件）を分析し、このユーザーの「詳細な性格プロフィール」をゼロから作成してください。
-
-【日記ログ】
-{journals_text}
-
-【指示】
-1. 基本タイプ「{base_type}」の枠組みを使いつつ、日記から読み取れる**このユーザー独自の**特徴、価値観、行動パターンを深く分析してください。
-2. 一般的な{base_type}の説明ではなく、日記のエビデンスに基づいた「生きた」人物像を描写してください。
-3. 強みと課題についても、日記の中で具体的に現れているものを抽出してください。
-4. 【重要】日記の内容から、4つの指標（EI, SN, TF, JP）に対する「現在の実際の傾向」を0.0〜1.0の数値で推定してください。
-   - 0.0に近いほど左側（E, S, T, J）、1.0に近いほど右側（I, N, F, P）の性質が強く出ています。
-   - 0.5は中立です。
-
-【回答形式】
-JSON形式で返答してください。
-```json
-{{
-    "refined_description": "詳細な人物像説明（400-500文字）。三人称（このユーザーは...）で記述。",
-    "validated_strengths": ["日記で確認された具体的な強み（5-7個）"],
-    "observed_challenges": ["日記で確認された具体的な課題（5-7個）"],
-    "estimated_axis_scores": {{
-        "EI": 0.3,
-        "SN": 0.7,
-        "TF": 0.4,
-        "JP": 0.6
-    }}
-}}
-```
-"""
+    personality_guidance = _get_personality_feedback_guidance(personality_type)
+
+    entries_text = "\n\n".join(
+        f"[日記 {i + 1}] 気分: {emotion_score}/10\n{content}"
+        for i, content, emotion_score in targets
+    )
+
+    prompt = f"""【クライアント情報】
+- 性格タイプ: {personality_type if personality_type else '未診断'}
+{personality_guidance}
+
+【日記】
+{entries_text}"""
 
     try:
-        response = client.models.generate_content(
-            model="gemini-flash-latest",
-            contents=prompt,
+        response_text = await _generate_text(
+            client,
+            prompt,
+            model=FEEDBACK_MODEL,
+            use_cache=False,
+            cache_write=False,
+            response_schema=BatchFeedbackResponse,
+            system_instruction=_BATCH_FEEDBACK_INSTRUCTION,
         )
-        
-        # Parse JSON
-        import json
-        import re
-        
-        json_match = re.search(r'```json\s*(.*?)\s*```', response.text, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(1)
-        else:
-            json_str = response.text
-            
-        data = json.loads(json_str)
-        
-        new_profile = DynamicTypeProfile(
-            user_id=user_id,
-            base_type=base_type,
-            refined_description=data.get("refined_description", ""),
-            validated_strengths=data.get("validated_strengths", []),
-            observed_challenges=data.get("observed_challenges", []),
-            estimated_axis_scores=data.get("estimated_axis_scores", {}),
-            last_updated=get_jst_now()
-        )
-        
-        save_dynamic_profile(new_profile)
-        return new_profile, None
-
+        data = BatchFeedbackResponse.model_validate_json(response_text)
     except Exception as e:
-        return None, str(e)
+        _handle_api_error(e)
+        return feedbacks, str(e)
+
+    for item in data.feedbacks:
+        index = item.id - 1
+        if 0 <= index < len(feedbacks):
+            feedbacks[index] = item.text.strip()
+    return feedbacks, None
 
 
 def _get_personality_feedback_guidance(personality_type: Optional[str]) -> str:
@@ -515,6 +887,16 @@ def _get_emotion_aware_tone(emotion_score: int) -> str:
 def get_weekly_insight(
     journals: list,
     personality_type: Optional[str] = None,
+) -> tuple[Optional[str], Optional[str]]:
+    """
+    週間のジャーナルから気づきを生成（a_get_weekly_insight の同期版）
+    """
+    return _run_sync(a_get_weekly_insight(journals, personality_type))
+
+
+async def a_get_weekly_insight(
+    journals: list,
+    personality_type: Optional[str] = None,
 ) -> tuple[Optional[str], Optional[str]]:
     """
     週間のジャーナルから気づきを生成
@@ -533,81 +915,112 @@ def get_weekly_insight(
     
     if len(journals) < 3:
         return None, "週間インサイトには最低3件の日記が必要です"
-    
+
+    prompt = _build_weekly_insight_prompt(journals, personality_type)
+
+    try:
+        response_text = await _generate_text(
+            client,
+            prompt,
+            system_instruction=_WEEKLY_INSIGHT_INSTRUCTION,
+        )
+        return response_text.strip(), None
+    except Exception as e:
+        _handle_api_error(e)
+        return None, str(e)
+
+
+def stream_weekly_insight(
+    journals: list,
+    personality_type: Optional[str] = None,
+) -> tuple[Optional[Iterator[str]], Optional[str]]:
+    """
+    週間のジャーナルからの気づきを、生成された部分から順に取得
+
+    st.write_stream にそのまま渡して表示できる。
+
+    Args:
+        journals: 過去1週間のジャーナルリスト
+        personality_type: 性格タイプ
+
+    Returns:
+        (週間インサイトの断片を返すイテレータ, エラーメッセージ) のタプル
+        API呼び出しのエラーはイテレータの読み出し中に送出される
+    """
+    client = get_gemini_client()
+
+    if client is None:
+        return None, "APIキーが設定されていません"
+
+    if len(journals) < 3:
+        return None, "週間インサイトには最低3件の日記が必要です"
+
+    prompt = _build_weekly_insight_prompt(journals, personality_type)
+    return _stream_text(client, prompt, system_instruction=_WEEKLY_INSIGHT_INSTRUCTION), None
+
+
+def _build_weekly_insight_prompt(journals: list, personality_type: Optional[str]) -> str:
+    """週間インサイト用のプロンプト（性格タイプ・感情データ・日記）を構築"""
     # 感情スコアの統計を計算
-    emotion_scores = [j.emotion_score for j in journals]
-    avg_emotion = sum(emotion_scores) / len(emotion_scores)
-    min_emotion = min(emotion_scores)
-    max_emotion = max(emotion_scores)
+    emotion_scores = _emotion_scores(journals)
+    emotion_stats = _emotion_stats_from_scores(emotion_scores)
+    avg_emotion = emotion_stats["avg"]
+    min_emotion = emotion_stats["min"]
+    max_emotion = emotion_stats["max"]
     
     # 感情の傾向を分析（上昇・下降・安定）
     emotion_trend = _analyze_emotion_trend(emotion_scores)
     
     # ジャーナルを日付順にソートしてテキストに変換（全文を含める）
     sorted_journals = sorted(journals, key=lambda j: j.date)
-    journals_text = ""
+    parts: list[str] = []
     for journal in sorted_journals:
         date_str = journal.date.strftime("%m/%d(%a)")
         tags_str = f" [タグ: {', '.join(journal.tags)}]" if journal.tags else ""
         # 内容は500文字まで（200文字から拡張）
         content_preview = journal.content[:500] + "..." if len(journal.content) > 500 else journal.content
-        journals_text += f"\n【{date_str}】気分: {journal.emotion_score}/10{tags_str}\n{content_preview}\n"
+        parts.append(f"\n【{date_str}】気分: {journal.emotion_score}/10{tags_str}\n{content_preview}\n")
+    journals_text = "".join(parts)
     
-    personality_context = ""
-    if personality_type:
-        personality_context = f"""この方の性格タイプは「{personality_type}」です。
-このタイプの特徴を踏まえたアドバイスを含めてください。"""
-    
-    prompt = f"""あなたは経験豊富な心理カウンセラーです。
-クライアントの1週間の日記を振り返り、深い洞察と温かい励ましを提供してください。
-
-{personality_context}
+    personality_context = f"【性格タイプ】{personality_type}\n\n" if personality_type else ""
 
-【感情データ】
+    return f"""{personality_context}【感情データ】
 - 平均気分: {avg_emotion:.1f}/10
 - 最高の日: {max_emotion}/10
-- 最低の日: {min_emotion}/10  
+- 最低の日: {min_emotion}/10
 - 傾向: {emotion_trend}
 
 【今週の日記】
-{journals_text}
+{journals_text}"""
 
-【分析の視点】
-1. 1週間を通じた感情の流れ（どんな時に上がり、どんな時に下がったか）
-2. 繰り返し現れるテーマや関心事
-3. この1週間で見られた小さな成長や良い変化
-4. 来週をより良くするための具体的な提案
 
-【回答形式】
-以下の形式で、合計300〜400文字程度で回答してください。
-温かみがありながらも、具体的な洞察を含めてください。
+# 包括的プロフィール生成に使う日記の最大件数（新しいものから）
+PROFILE_JOURNAL_LIMIT = 30
 
-📊 **今週の振り返り**
-（1週間の感情の流れと主なテーマを2-3文で）
+# 包括的プロフィール生成用のプロンプト（{base_type} と {journals_text} を埋め込む）
+_PROFILE_PROMPT_TEMPLATE = """【基本性格タイプ】{base_type}
 
-✨ **見つけた光**
-（今週の良かった点、成長を1-2文で）
-
-💡 **気づき**
-（深い洞察や発見を1-2文で）
+【日記ログ（最大30件）】
+{journals_text}"""
 
-🌱 **来週へのヒント**
-（具体的で実践しやすい提案を1-2つ。その人の性格に合った形で）"""
 
-    try:
-        response = client.models.generate_content(
-            model="gemini-flash-latest",
-            contents=prompt,
-        )
-        return response.text.strip(), None
-    except Exception as e:
-        return None, str(e)
+def generate_comprehensive_profile(
+    user_id: str,
+    base_type: str,
+    journals: list[JournalEntry],
+    use_cache: bool = True,
+) -> tuple[Optional[DynamicTypeProfile], Optional[str]]:
+    """
+    全ジャーナルに基づいて包括的なプロフィールを生成する（一括更新用、a_generate_comprehensive_profile の同期版）
+    """
+    return _run_sync(a_generate_comprehensive_profile(user_id, base_type, journals, use_cache))
 
 
-def generate_comprehensive_profile(
+async def a_generate_comprehensive_profile(
     user_id: str,
     base_type: str,
     journals: list[JournalEntry],
+    use_cache: bool = True,
 ) -> tuple[Optional[DynamicTypeProfile], Optional[str]]:
     """
     全ジャーナルに基づいて包括的なプロフィールを生成する（一括更新用）
@@ -616,6 +1029,7 @@ def generate_comprehensive_profile(
         user_id: ユーザーID
         base_type: 基本性格タイプ
         journals: ジャーナルエントリーのリスト
+        use_cache: Falseの場合はキャッシュ済みの結果を使わずに再生成する（結果はキャッシュに保存し直す）
 
     Returns:
         (NewProfile, ErrorMessage)
@@ -627,92 +1041,107 @@ def generate_comprehensive_profile(
     if not journals:
         return None, "分析するジャーナルがありません"
 
-    # ジャーナルをテキストに変換（最新のものから最大20件程度を使用）
+    # ジャーナルをテキストに変換（最新のものから最大 PROFILE_JOURNAL_LIMIT 件を使用）
     # トークン数を考慮して、内容を結合
-    sorted_journals = sorted(journals, key=lambda j: j.date, reverse=True)[:30]
-    journals_text = ""
-    for journal in sorted_journals:
-        date_str = journal.date.strftime("%Y/%m/%d")
-        journals_text += f"\n--- {date_str} ---\n{journal.content}\n"
-
-    prompt = f"""あなたは性格分析の専門家です。
-ユーザーの基本性格タイプは「{base_type}」です。
-以下の過去の日記ログ（最大30件）を分析し、このユーザーの「詳細な性格プロフィール」をゼロから作成してください。
-
-【日記ログ】
-{journals_text}
-
-【指示】
-1. 基本タイプ「{base_type}」の枠組みを使いつつ、日記から読み取れる**このユーザー独自の**特徴、価値観、行動パターンを深く分析してください。
-2. 一般的な{base_type}の説明ではなく、日記のエビデンスに基づいた「生きた」人物像を描写してください。
-3. 強みと課題についても、日記の中で具体的に現れているものを抽出してください。
-4. 【重要】日記の内容から、4つの指標（EI, SN, TF, JP）に対する「現在の実際の傾向」を0.0〜1.0の数値で推定してください。
-   - 0.0に近いほど左側（E, S, T, J）、1.0に近いほど右側（I, N, F, P）の性質が強く出ています。
-   - 0.5は中立です。
-
-【回答形式】
-JSON形式で返答してください。
-```json
-{{
-    "refined_description": "詳細な人物像説明（400-500文字）。三人称（このユーザーは...）で記述。",
-    "validated_strengths": ["日記で確認された具体的な強み（5-7個）"],
-    "observed_challenges": ["日記で確認された具体的な課題（5-7個）"],
-    "estimated_axis_scores": {{
-        "EI": 0.3,
-        "SN": 0.7,
-        "TF": 0.4,
-        "JP": 0.6
-    }}
-}}
-```
-"""
+    sorted_journals = heapq.nlargest(PROFILE_JOURNAL_LIMIT, journals, key=attrgetter("date"))
+    journals_text = await _fit_to_budget(
+        client,
+        [
+            f"\n--- {journal.date.year}/{journal.date.month:02d}/{journal.date.day:02d} ---\n{journal.content}\n"
+            for journal in sorted_journals
+        ],
+    )
+
+    prompt = _PROFILE_PROMPT_TEMPLATE.format(base_type=base_type, journals_text=journals_text)
 
     try:
-        response = client.models.generate_content(
-            model="gemini-flash-latest",
-            contents=prompt,
+        response_text = await _generate_text(
+            client,
+            prompt,
+            use_cache=use_cache,
+            response_schema=ProfileResponse,
+            system_instruction=_COMPREHENSIVE_PROFILE_INSTRUCTION,
         )
-        
-        # Parse JSON
-        import json
-        import re
-        
-        json_match = re.search(r'```json\s*(.*?)\s*```', response.text, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(1)
-        else:
-            json_str = response.text
-            
-        data = json.loads(json_str)
-        
+        data = ProfileResponse.model_validate_json(response_text)
+
         new_profile = DynamicTypeProfile(
             user_id=user_id,
             base_type=base_type,
-            refined_description=data.get("refined_description", ""),
-            validated_strengths=data.get("validated_strengths", []),
-            observed_challenges=data.get("observed_challenges", []),
-            estimated_axis_scores=data.get("estimated_axis_scores", {}),
+            refined_description=data.refined_description,
+            validated_strengths=data.validated_strengths,
+            observed_challenges=data.observed_challenges,
+            estimated_axis_scores=data.estimated_axis_scores.model_dump(),
             last_updated=get_jst_now()
         )
         
-        save_dynamic_profile(new_profile)
+        # DBへの書き込みはイベントループを止めないよう別スレッドで行う
+        await asyncio.to_thread(save_dynamic_profile, new_profile)
         return new_profile, None
 
     except Exception as e:
+        _handle_api_error(e)
         return None, str(e)
 
 
-def _analyze_emotion_trend(scores: list[int]) -> str:
+# 一括生成で同時に実行するAPI呼び出しの最大数
+BULK_PROFILE_CONCURRENCY = 10
+
+
+def generate_profiles_bulk(
+    requests: list[tuple[str, str, list[JournalEntry]]],
+) -> list[tuple[str, Optional[DynamicTypeProfile], Optional[str]]]:
+    """
+    複数ユーザーの包括的プロフィールをまとめて生成する（a_generate_profiles_bulk の同期版）
+    """
+    return _run_sync(a_generate_profiles_bulk(requests))
+
+
+async def a_generate_profiles_bulk(
+    requests: list[tuple[str, str, list[JournalEntry]]],
+) -> list[tuple[str, Optional[DynamicTypeProfile], Optional[str]]]:
+    """
+    複数ユーザーの包括的プロフィールをまとめて生成する（管理者による一括再生成用）
+
+    同時に BULK_PROFILE_CONCURRENCY 件までAPIを呼び出すため、
+    全体の所要時間は1件ずつ順に生成する場合のおよそ 1/BULK_PROFILE_CONCURRENCY になる。
+
+    Args:
+        requests: (ユーザーID, 基本性格タイプ, ジャーナルエントリーのリスト) のリスト
+
+    Returns:
+        requests と同じ順の (ユーザーID, NewProfile, ErrorMessage) のリスト
+    """
+    semaphore = asyncio.Semaphore(BULK_PROFILE_CONCURRENCY)
+
+    async def _generate(
+        user_id: str,
+        base_type: str,
+        journals: list[JournalEntry],
+    ) -> tuple[str, Optional[DynamicTypeProfile], Optional[str]]:
+        async with semaphore:
+            profile, error = await a_generate_comprehensive_profile(user_id, base_type, journals)
+        return user_id, profile, error
+
+    return await asyncio.gather(
+        *(_generate(user_id, base_type, journals) for user_id, base_type, journals in requests)
+    )
+
+
+def _emotion_scores(journals: list) -> np.ndarray:
+    """ジャーナルリストから感情スコアの配列を作成"""
+    return np.fromiter((j.emotion_score for j in journals), dtype=np.int8, count=len(journals))
+
+
+def _analyze_emotion_trend(scores: list[int] | np.ndarray) -> str:
     """感情スコアのトレンドを分析"""
     if len(scores) < 2:
         return "データ不足"
-    
-    # 前半と後半の平均を比較
+
+    scores = np.asarray(scores)
+
+    # 前半と後半の平均を比較（2件以上あるため前半・後半とも空にならない）
     mid = len(scores) // 2
-    first_half_avg = sum(scores[:mid]) / mid if mid > 0 else 0
-    second_half_avg = sum(scores[mid:]) / (len(scores) - mid)
-    
-    diff = second_half_avg - first_half_avg
+    diff = scores[mid:].mean() - scores[:mid].mean()
     
     if diff > 1:
         return "上昇傾向 📈 週の後半に向けて気分が上向いています"
@@ -720,8 +1149,7 @@ def _analyze_emotion_trend(scores: list[int]) -> str:
         return "下降傾向 📉 週の後半に気分が下がっています"
     else:
         # 変動の大きさをチェック
-        variance = sum((s - sum(scores)/len(scores))**2 for s in scores) / len(scores)
-        if variance > 4:
+        if scores.var() > 4:
             return "変動あり 🎢 日によって気分の波があります"
         else:
             return "安定 ➡️ 比較的安定した1週間でした"
@@ -732,18 +1160,33 @@ def calculate_emotion_stats(journals: list) -> dict[str, float]:
     if not journals:
         return {}
     
-    scores = [j.emotion_score for j in journals]
+    return _emotion_stats_from_scores(_emotion_scores(journals))
+
+
+def _emotion_stats_from_scores(scores: np.ndarray) -> dict[str, float]:
+    """感情スコアの配列から統計を計算（値はPythonの数値で返す）"""
     return {
-        "avg": sum(scores) / len(scores),
-        "min": min(scores),
-        "max": max(scores),
-        "range": max(scores) - min(scores),
+        "avg": float(scores.mean()),
+        "min": int(scores.min()),
+        "max": int(scores.max()),
+        "range": int(np.ptp(scores)),
     }
 
 def refine_profile_with_journal(
     user_id: str,
     base_type: str,
     journal_entry: JournalEntry,
+) -> tuple[Optional[DynamicTypeProfile], Optional[str]]:
+    """
+    ジャーナルに基づいてプロフィールを詳細化・更新する（a_refine_profile_with_journal の同期版）
+    """
+    return _run_sync(a_refine_profile_with_journal(user_id, base_type, journal_entry))
+
+
+async def a_refine_profile_with_journal(
+    user_id: str,
+    base_type: str,
+    journal_entry: JournalEntry,
 ) -> tuple[Optional[DynamicTypeProfile], Optional[str]]:
     """
     ジャーナルに基づいてプロフィールを詳細化・更新する
@@ -760,8 +1203,8 @@ def refine_profile_with_journal(
     if client is None:
         return None, "APIキーが設定されていません"
 
-    # 現在の動的プロフィールを取得
-    current_profile = get_dynamic_profile(user_id)
+    # 現在の動的プロフィールを取得（DBアクセスはイベントループを止めないよう別スレッドで行う）
+    current_profile = await asyncio.to_thread(get_dynamic_profile, user_id)
     
     # プロフィールの初期化（まだ存在しない場合）
     if current_profile is None:
@@ -773,10 +1216,7 @@ def refine_profile_with_journal(
         current_strengths = current_profile.validated_strengths
         current_challenges = current_profile.observed_challenges
 
-    prompt = f"""あなたは性格分析の専門家です。
-ユーザーの基本性格タイプは「{base_type}」です。
-これまでの観察（プロフィール）と、新しい日記のエビデンスに基づいて、
-このユーザーの「個人化された性格プロフィール」を更新してください。
+    prompt = f"""【基本性格タイプ】{base_type}
 
 【現在のプロフィール】
 - 詳細説明: {current_description}
@@ -784,163 +1224,32 @@ def refine_profile_with_journal(
 - 観察された課題: {', '.join(current_challenges) if current_challenges else 'なし'}
 
 【新しい日記】
-日付: {journal_entry.date.strftime('%Y/%m/%d')}
-内容: {journal_entry.content}
-
-【指示】
-1. この日記が、ユーザーの性格（強み・課題・特徴）について何を明らかにしているか分析してください。
-2. 「{base_type}」の一般的な特徴と照らし合わせ、このユーザー独自のニュアンスを捉えてください。
-3. 以前の説明を維持しつつ、新しい発見を統合して説明を洗練させてください。
-4. 強みや課題リストも必要に応じて更新・追加してください。
-5. 【重要】日記の内容から、4つの指標（EI, SN, TF, JP）に対する「現在の実際の傾向」を0.0〜1.0の数値で推定してください。
-   - 0.0に近いほど左側（E, S, T, J）、1.0に近いほど右側（I, N, F, P）の性質が強く出ています。
-   - 0.5は中立です。
-
-【回答形式】
-JSON形式で返答してください。
-```json
-{{
-    "refined_description": "更新された詳細説明（300-400文字）。三人称（このユーザーは...）で記述。",
-    "validated_strengths": ["リスト（最大5-7個）"],
-    "observed_challenges": ["リスト（最大5-7個）"],
-    "estimated_axis_scores": {{
-        "EI": 0.3,
-        "SN": 0.7,
-        "TF": 0.4,
-        "JP": 0.6
-    }}
-}}
-```
-"""
+日付: {journal_entry.date.year}/{journal_entry.date.month:02d}/{journal_entry.date.day:02d}
+内容: {journal_entry.content}"""
 
     try:
-        response = client.models.generate_content(
-            model="gemini-flash-latest",
-            contents=prompt,
+        response_text = await _generate_text(
+            client,
+            prompt,
+            response_schema=ProfileResponse,
+            system_instruction=_REFINE_PROFILE_INSTRUCTION,
         )
-        
-        # Parse JSON
-        import json
-        import re
-        
-        json_match = re.search(r'```json\s*(.*?)\s*```', response.text, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(1)
-        else:
-            json_str = response.text
-            
-        data = json.loads(json_str)
-        
-        new_profile = DynamicTypeProfile(
-            user_id=user_id,
-            base_type=base_type,
-            refined_description=data.get("refined_description", current_description),
-            validated_strengths=data.get("validated_strengths", current_strengths),
-            observed_challenges=data.get("observed_challenges", current_challenges),
-            estimated_axis_scores=data.get("estimated_axis_scores", {}),
-            last_updated=get_jst_now()
-        )
-        
-        save_dynamic_profile(new_profile)
-        return new_profile, None
-
-    except Exception as e:
-        return None, str(e)
-
-
-def generate_comprehensive_profile(
-    user_id: str,
-    base_type: str,
-    journals: list[JournalEntry],
-) -> tuple[Optional[DynamicTypeProfile], Optional[str]]:
-    """
-    全ジャーナルに基づいて包括的なプロフィールを生成する（一括更新用）
-
-    Args:
-        user_id: ユーザーID
-        base_type: 基本性格タイプ
-        journals: ジャーナルエントリーのリスト
+        data = ProfileResponse.model_validate_json(response_text)
 
-    Returns:
-        (NewProfile, ErrorMessage)
-    """
-    client = get_gemini_client()
-    if client is None:
-        return None, "APIキーが設定されていません"
-
-    if not journals:
-        return None, "分析するジャーナルがありません"
-
-    # ジャーナルをテキストに変換（最新のものから最大20件程度を使用）
-    # トークン数を考慮して、内容を結合
-    sorted_journals = sorted(journals, key=lambda j: j.date, reverse=True)[:30]
-    journals_text = ""
-    for journal in sorted_journals:
-        date_str = journal.date.strftime("%Y/%m/%d")
-        journals_text += f"\n--- {date_str} ---\n{journal.content}\n"
-
-    prompt = f"""あなたは性格分析の専門家です。
-ユーザーの基本性格タイプは「{base_type}」です。
-以下の過去の日記ログ（最大30件）を分析し、このユーザーの「詳細な性格プロフィール」をゼロから作成してください。
-
-【日記ログ】
-{journals_text}
-
-【指示】
-1. 基本タイプ「{base_type}」の枠組みを使いつつ、日記から読み取れる**このユーザー独自の**特徴、価値観、行動パターンを深く分析してください。
-2. 一般的な{base_type}の説明ではなく、日記のエビデンスに基づいた「生きた」人物像を描写してください。
-3. 強みと課題についても、日記の中で具体的に現れているものを抽出してください。
-4. 【重要】日記の内容から、4つの指標（EI, SN, TF, JP）に対する「現在の実際の傾向」を0.0〜1.0の数値で推定してください。
-   - 0.0に近いほど左側（E, S, T, J）、1.0に近いほど右側（I, N, F, P）の性質が強く出ています。
-   - 0.5は中立です。
-
-【回答形式】
-JSON形式で返答してください。
-```json
-{{
-    "refined_description": "詳細な人物像説明（400-500文字）。三人称（このユーザーは...）で記述。",
-    "validated_strengths": ["日記で確認された具体的な強み（5-7個）"],
-    "observed_challenges": ["日記で確認された具体的な課題（5-7個）"],
-    "estimated_axis_scores": {{
-        "EI": 0.3,
-        "SN": 0.7,
-        "TF": 0.4,
-        "JP": 0.6
-    }}
-}}
-```
-"""
-
-    try:
-        response = client.models.generate_content(
-            model="gemini-flash-latest",
-            contents=prompt,
-        )
-        
-        # Parse JSON
-        import json
-        import re
-        
-        json_match = re.search(r'```json\s*(.*?)\s*```', response.text, re.DOTALL)
-        if json_match:
-            json_str = json_match.group(1)
-        else:
-            json_str = response.text
-            
-        data = json.loads(json_str)
-        
         new_profile = DynamicTypeProfile(
             user_id=user_id,
             base_type=base_type,
-            refined_description=data.get("refined_description", ""),
-            validated_strengths=data.get("validated_strengths", []),
-            observed_challenges=data.get("observed_challenges", []),
-            estimated_axis_scores=data.get("estimated_axis_scores", {}),
+            refined_description=data.refined_description or current_description,
+            validated_strengths=data.validated_strengths or current_strengths,
+            observed_challenges=data.observed_challenges or current_challenges,
+            estimated_axis_scores=data.estimated_axis_scores.model_dump(),
             last_updated=get_jst_now()
         )
         
-        save_dynamic_profile(new_profile)
+        # DBへの書き込みはイベントループを止めないよう別スレッドで行う
+        await asyncio.to_thread(save_dynamic_profile, new_profile)
         return new_profile, None
 
     except Exception as e:
+        _handle_api_error(e)
         return None, str(e)
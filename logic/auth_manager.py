@@ -1,8 +1,80 @@
+import base64
+import hashlib
+import hmac
+import json
 import os
+import threading
+import time
+from contextlib import contextmanager
+import httplib2
 import streamlit as st
+import streamlit.components.v1 as components
 import google.oauth2.credentials
 import google_auth_oauthlib.flow
+import google_auth_httplib2
+from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+
+
+def _token_fingerprint(token):
+    """Short, non-reversible cache key for an access token."""
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+# Timeout (seconds) for Google API calls
+_HTTP_TIMEOUT = 10
+
+# Idle httplib2.Http objects kept so the TLS connection to googleapis.com stays warm across reruns.
+# httplib2.Http is not thread-safe, so each one is checked out by a single caller at a time
+# and concurrent logins simply open another.
+_HTTP_POOL_MAX_IDLE = 4
+_idle_http = []
+_http_pool_lock = threading.Lock()
+
+
+@contextmanager
+def _pooled_http():
+    """Check out an idle httplib2.Http (or create one) and return it to the pool afterwards."""
+    with _http_pool_lock:
+        http = _idle_http.pop() if _idle_http else None
+    if http is None:
+        http = httplib2.Http(timeout=_HTTP_TIMEOUT)
+    try:
+        yield http
+    finally:
+        with _http_pool_lock:
+            if len(_idle_http) < _HTTP_POOL_MAX_IDLE:
+                _idle_http.append(http)
+
+
+# Signed login cookie: lets a page refresh restore the session without another OAuth round-trip
+SESSION_COOKIE_NAME = "self_analysis_session"
+SESSION_TTL_SECONDS = 7 * 24 * 3600
+# Treat tokens that expire within this window as already expired
+_SESSION_EXPIRY_BUFFER = 300
+# Only what the app needs after login is stored; OAuth tokens never leave the server
+_SESSION_USER_FIELDS = ("email", "name", "picture")
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _fetch_user_info(token_fingerprint, _credentials):
+    """Fetch user info once per access token (credentials are not hashed; the fingerprint is the key)."""
+    # Use the discovery document bundled with googleapiclient instead of fetching it over HTTP
+    # and reuse a pooled keep-alive connection rather than opening a new one per service
+    with _pooled_http() as pooled_http:
+        http = google_auth_httplib2.AuthorizedHttp(_credentials, http=pooled_http)
+        service = build("oauth2", "v2", http=http, static_discovery=True)
+        return service.userinfo().get().execute()
+
 
 class AuthManager:
     def __init__(self):
@@ -17,6 +89,7 @@ class AuthManager:
         # Cloud: https://[your-app].streamlit.app
         # We try to detect or expect it in secrets, default to localhost for dev
         self.redirect_uri = self._get_redirect_uri()
+        self.cookie_secret = self._get_cookie_secret()
 
     def _get_client_config(self):
         """
@@ -49,6 +122,65 @@ class AuthManager:
             return st.secrets["google_auth"]["redirect_uri"]
         return "http://localhost:8501"
 
+    def _get_cookie_secret(self):
+        """HMAC key for the login cookie (secrets: google_auth.cookie_secret). Without it, sessions are not persisted."""
+        if hasattr(st, "secrets") and "google_auth" in st.secrets and "cookie_secret" in st.secrets["google_auth"]:
+            return st.secrets["google_auth"]["cookie_secret"].encode()
+        return None
+
+    def _sign(self, payload):
+        return _b64encode(hmac.new(self.cookie_secret, payload.encode(), hashlib.sha256).digest())
+
+    def issue_session_token(self, user_info):
+        """Create a signed token (payload.signature) carrying the user's identity and an expiry."""
+        if not self.cookie_secret or not user_info.get("email"):
+            return None
+        claims = {key: user_info[key] for key in _SESSION_USER_FIELDS if user_info.get(key)}
+        claims["exp"] = int(time.time()) + SESSION_TTL_SECONDS
+        payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        return f"{payload}.{self._sign(payload)}"
+
+    def verify_session_token(self, token):
+        """Return the user info in a token if its signature is valid and it has not expired, else None."""
+        if not self.cookie_secret or not token or token.count(".") != 1:
+            return None
+        payload, signature = token.split(".")
+        # Compare bytes: compare_digest raises TypeError on str values with non-ASCII characters
+        if not hmac.compare_digest(signature.encode(), self._sign(payload).encode()):
+            return None
+        try:
+            claims = json.loads(_b64decode(payload))
+        except ValueError:
+            return None
+        if claims.pop("exp", 0) - _SESSION_EXPIRY_BUFFER < time.time():
+            return None
+        return claims
+
+    def restore_session(self):
+        """Restore user info from the login cookie sent with this browser session, if any."""
+        if not self.cookie_secret:
+            return None
+        return self.verify_session_token(st.context.cookies.get(SESSION_COOKIE_NAME))
+
+    def _write_cookie(self, value, max_age):
+        # Streamlit cannot set response headers, so the cookie is written from a zero-height component
+        attributes = f"path=/; max-age={max_age}; SameSite=Lax"
+        if self.redirect_uri.startswith("https://"):
+            attributes += "; Secure"
+        cookie = json.dumps(f"{SESSION_COOKIE_NAME}={value}; {attributes}")
+        components.html(f"<script>window.parent.document.cookie = {cookie};</script>", height=0)
+
+    def persist_session(self, user_info):
+        """Store a signed login cookie so that a page refresh skips the OAuth flow."""
+        token = self.issue_session_token(user_info)
+        if token:
+            self._write_cookie(token, SESSION_TTL_SECONDS)
+
+    def clear_session(self):
+        """Delete the login cookie (on logout)."""
+        if self.cookie_secret:
+            self._write_cookie("", 0)
+
     def get_auth_url(self):
         """Generate the authorization URL."""
         if not self.client_config:
@@ -82,11 +214,17 @@ class AuthManager:
         return flow.credentials
 
     def get_user_info(self, credentials):
-        """Get user info from Google API."""
+        """Get user info from Google API (cached per access token for 5 minutes)."""
         try:
-            service = build("oauth2", "v2", credentials=credentials)
-            user_info = service.userinfo().get().execute()
-            return user_info
+            try:
+                return _fetch_user_info(_token_fingerprint(credentials.token), credentials)
+            except HttpError as e:
+                if e.resp.status != 401 or not credentials.refresh_token:
+                    raise
+                # Token expired or revoked: drop cached entries, refresh and retry once
+                _fetch_user_info.clear()
+                credentials.refresh(Request())
+                return _fetch_user_info(_token_fingerprint(credentials.token), credentials)
         except Exception as e:
             st.error(f"Failed to fetch user info: {e}")
             return None
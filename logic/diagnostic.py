@@ -4,14 +4,58 @@
 ユーザーの回答から性格タイプと各指標の強度を計算します。
 """
 
+from collections.abc import Sequence
+from functools import lru_cache
+
+import numpy as np
+
 from models.data_models import (
     Dimension,
     DimensionScore,
-    Direction,
     PersonalityResult,
     UserResponse,
 )
-from data.questions import DIAGNOSTIC_QUESTIONS, get_question_by_id
+from data.questions import DIAGNOSTIC_QUESTIONS
+
+
+# 質問IDを添字とする質問の指標（0-3、質問がないIDは-1）
+# インポート時に1回だけ構築し、回答全体を配列演算でまとめて集計する
+_Q_DIM: np.ndarray = np.full(max(q.id for q in DIAGNOSTIC_QUESTIONS) + 1, -1, dtype=np.int8)
+
+# [質問ID, 回答スコア(1-5)] を添字とする第1タイプの得点（0-4）
+# 正方向の質問は高スコアが第1タイプ、逆方向の質問は高スコアが第2タイプ（第2タイプの得点は 4 - 第1タイプの得点）
+# 中央の3を2点とし、方向の値（+1/-1）を符号として掛ける
+_Q_FIRST_POINTS: np.ndarray = np.zeros((len(_Q_DIM), 6), dtype=np.int8)
+
+_RAW_SCORES = np.arange(1, 6)
+for _question in DIAGNOSTIC_QUESTIONS:
+    _Q_DIM[_question.id] = int(_question.dimension)
+    _Q_FIRST_POINTS[_question.id, 1:] = 2 + int(_question.direction) * (_RAW_SCORES - 3)
+del _question, _RAW_SCORES
+
+# 指標の並び順（性格タイプの4文字はこの順に並ぶ）
+_ALL_DIMENSIONS: tuple[Dimension, ...] = (Dimension.EI, Dimension.SN, Dimension.TF, Dimension.JP)
+
+# 指標に対応するタイプ名（第1タイプ, 第2タイプ）
+_TYPE_MAPPING: dict[Dimension, tuple[str, str]] = {
+    Dimension.EI: ("E", "I"),
+    Dimension.SN: ("S", "N"),
+    Dimension.TF: ("T", "F"),
+    Dimension.JP: ("J", "P"),
+}
+
+
+# タイプ（E/I/S/N/T/F/J/P）ごとの説明
+_DIMENSION_EXPLANATIONS: dict[str, str] = {
+    "E": "外向型：人との交流からエネルギーを得ます。社交的で、考えを話しながら整理する傾向があります。",
+    "I": "内向型：一人の時間からエネルギーを得ます。深く考えてから行動し、少数の深い関係を好みます。",
+    "S": "感覚型：具体的な事実や詳細を重視します。現実的で実践的なアプローチを好みます。",
+    "N": "直観型：可能性やパターンを重視します。抽象的なアイデアや将来のビジョンに関心があります。",
+    "T": "思考型：論理と客観性を重視して判断します。公平さと効率を大切にします。",
+    "F": "感情型：価値観と人間関係を重視して判断します。調和と共感を大切にします。",
+    "J": "判断型：計画と秩序を好みます。決断を下すことで安心感を得ます。",
+    "P": "知覚型：柔軟性と適応力を好みます。選択肢を残しておくことを好みます。",
+}
 
 
 def calculate_dimension_score(
@@ -28,49 +72,48 @@ def calculate_dimension_score(
     Returns:
         DimensionScore: 指標のスコア詳細
     """
-    # 指標に対応するタイプ名
-    type_mapping: dict[Dimension, tuple[str, str]] = {
-        Dimension.EI: ("E", "I"),
-        Dimension.SN: ("S", "N"),
-        Dimension.TF: ("T", "F"),
-        Dimension.JP: ("J", "P"),
-    }
-
-    first_type, second_type = type_mapping[dimension]
-
-    # この指標の質問に対する回答を抽出
-    dimension_questions = [q for q in DIAGNOSTIC_QUESTIONS if q.dimension == dimension]
-    question_ids = {q.id for q in dimension_questions}
-
-    dimension_responses = [r for r in responses if r.question_id in question_ids]
-
-    # スコア計算
-    first_score = 0.0
-    second_score = 0.0
-
-    for response in dimension_responses:
-        question = get_question_by_id(response.question_id)
-        if question is None:
-            continue
-
-        # スコアを0-4の範囲に正規化（1-5 → 0-4）
-        normalized_score = response.score - 1
-
-        if question.direction == Direction.POSITIVE:
-            # 正方向: 高スコアが第1タイプ
-            first_score += normalized_score
-            second_score += 4 - normalized_score
-        else:
-            # 逆方向: 高スコアが第2タイプ
-            second_score += normalized_score
-            first_score += 4 - normalized_score
-
-    # 強度の計算（%）
+    first_scores, second_scores = _score_totals([(r.question_id, r.score) for r in responses])
+    return _dimension_score(dimension, first_scores[dimension], second_scores[dimension])
+
+
+def _score_totals(answers: Sequence[tuple[int, int]]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (質問ID, スコア) の並びから、4指標それぞれの第1・第2タイプのスコア合計を計算する
+
+    Returns:
+        (第1タイプのスコア合計, 第2タイプのスコア合計)。どちらも指標の値を添字とする長さ4の配列
+    """
+    if not answers:
+        return np.zeros(len(Dimension)), np.zeros(len(Dimension))
+
+    question_ids, scores = np.array(answers, dtype=np.int64).T
+
+    # 存在しない質問への回答は除外
+    known = (question_ids >= 0) & (question_ids < len(_Q_DIM))
+    question_ids, scores = question_ids[known], scores[known]
+    dims = _Q_DIM[question_ids]
+    known = dims >= 0
+    dims = dims[known]
+
+    # 質問と回答スコアの組から、第1タイプの得点を表引きする
+    first = _Q_FIRST_POINTS[question_ids[known], scores[known]]
+
+    first_scores = np.bincount(dims, weights=first, minlength=len(Dimension))
+    second_scores = np.bincount(dims, weights=4 - first, minlength=len(Dimension))
+    return first_scores, second_scores
+
+
+def _dimension_score(dimension: Dimension, first_score: float, second_score: float) -> DimensionScore:
+    """指標の第1・第2タイプのスコア合計から DimensionScore を作成する"""
+    first_type, second_type = _TYPE_MAPPING[dimension]
+
+    # NumPyの値はPythonのfloatに変換して保持する
+    first_score = float(first_score)
+    second_score = float(second_score)
+
+    # 強度の計算（%）。回答がない場合は差も0なので、分母を1にして0%とする
     total_score = first_score + second_score
-    if total_score > 0:
-        strength_percent = abs(first_score - second_score) / total_score * 100
-    else:
-        strength_percent = 0.0
+    strength_percent = abs(first_score - second_score) / (total_score or 1.0) * 100
 
     # 優勢なタイプの決定
     dominant_type = first_type if first_score >= second_score else second_type
@@ -100,17 +143,15 @@ def calculate_personality_type(
     Returns:
         PersonalityResult: 性格診断結果
     """
-    # 各指標のスコアを計算
-    dimension_scores: list[DimensionScore] = []
-    personality_type_chars: list[str] = []
+    # 回答の (質問ID, スコア) を並べ替えてキーにし、同じ回答に対する再計算を省く
+    # （スコアは合計なので回答の順序には依存しない）
+    answers = tuple(sorted((r.question_id, r.score) for r in responses))
 
-    for dimension in [Dimension.EI, Dimension.SN, Dimension.TF, Dimension.JP]:
-        score = calculate_dimension_score(responses, dimension)
-        dimension_scores.append(score)
-        personality_type_chars.append(score.dominant_type)
+    # 各指標のスコア（DimensionScore は不変なのでキャッシュ済みのものをそのまま使える）
+    dimension_scores = list(_calculate_dimension_scores(answers))
 
     # 4文字タイプを構築
-    personality_type = "".join(personality_type_chars)
+    personality_type = "".join(score.dominant_type for score in dimension_scores)
 
     return PersonalityResult(
         user_id=user_id,
@@ -119,6 +160,16 @@ def calculate_personality_type(
     )
 
 
+@lru_cache(maxsize=512)
+def _calculate_dimension_scores(answers: tuple[tuple[int, int], ...]) -> tuple[DimensionScore, ...]:
+    """4指標すべてのスコアを計算する（同じ回答の組み合わせは結果を使い回す）"""
+    first_scores, second_scores = _score_totals(answers)
+    return tuple(
+        _dimension_score(dimension, first_scores[dimension], second_scores[dimension])
+        for dimension in _ALL_DIMENSIONS
+    )
+
+
 def get_dimension_explanation(dimension: Dimension, dominant_type: str) -> str:
     """
     指標と優勢タイプに基づく説明を取得
@@ -130,15 +181,4 @@ def get_dimension_explanation(dimension: Dimension, dominant_type: str) -> str:
     Returns:
         str: タイプの説明
     """
-    explanations: dict[str, str] = {
-        "E": "外向型：人との交流からエネルギーを得ます。社交的で、考えを話しながら整理する傾向があります。",
-        "I": "内向型：一人の時間からエネルギーを得ます。深く考えてから行動し、少数の深い関係を好みます。",
-        "S": "感覚型：具体的な事実や詳細を重視します。現実的で実践的なアプローチを好みます。",
-        "N": "直観型：可能性やパターンを重視します。抽象的なアイデアや将来のビジョンに関心があります。",
-        "T": "思考型：論理と客観性を重視して判断します。公平さと効率を大切にします。",
-        "F": "感情型：価値観と人間関係を重視して判断します。調和と共感を大切にします。",
-        "J": "判断型：計画と秩序を好みます。決断を下すことで安心感を得ます。",
-        "P": "知覚型：柔軟性と適応力を好みます。選択肢を残しておくことを好みます。",
-    }
-
-    return explanations.get(dominant_type, "説明がありません")
+    return _DIMENSION_EXPLANATIONS.get(dominant_type, "説明がありません")
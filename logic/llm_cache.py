@@ -0,0 +1,122 @@
+"""
+LLMレスポンスキャッシュ
+
+同じモデル・同じプロンプトへの問い合わせ結果を保存し、
+再実行時のAPI呼び出し（待ち時間とトークン消費）を省きます。
+diskcache があればディスクに永続化し、なければプロセス内のメモリに保持します。
+
+注意: キャッシュにはユーザーの日記をもとに生成したAIの出力がそのまま入ります。
+diskcache 使用時は CACHE_DIR に暗号化されずに保存され、ユーザー単位での削除もできないため、
+CACHE_DIR は他者が読めない場所に置き、不要になったら clear_llm_cache() で消去してください。
+ユーザーが明示的に再分析する場合は、呼び出し側で use_cache=False を指定してキャッシュを使わずに取り直します（結果は保存し直す）。
+日記ごとのフィードバックのように再利用しない応答は cache_write=False を指定し、キャッシュに保存しません。
+"""
+
+import hashlib
+import threading
+import time
+from typing import Optional
+
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+
+# キャッシュの保存先ディレクトリ（diskcache使用時）
+CACHE_DIR = ".llm_cache"
+
+# 既定の有効期限（秒）
+DEFAULT_TTL = 86400
+
+# メモリキャッシュの最大件数（diskcacheがない場合）
+_MEMORY_CACHE_MAX_ENTRIES = 256
+
+_disk_cache = None
+_memory_cache: dict[str, tuple[float, str]] = {}
+_lock = threading.Lock()
+
+
+def _get_disk_cache():
+    """diskcacheのキャッシュを取得（初回のみ生成、使えない場合はNone）"""
+    global _disk_cache
+    if diskcache is None:
+        return None
+    with _lock:
+        if _disk_cache is None:
+            _disk_cache = diskcache.Cache(CACHE_DIR)
+    return _disk_cache
+
+
+def make_key(model: str, prompt: str, system_instruction: Optional[str] = None) -> str:
+    """
+    キャッシュキーを生成
+
+    Args:
+        model: モデル名
+        prompt: プロンプト
+        system_instruction: システム指示（あれば）
+
+    Returns:
+        モデル名とプロンプト（およびシステム指示）のハッシュからなるキー
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    if system_instruction:
+        hasher.update(system_instruction.encode())
+        hasher.update(b"\0")
+    hasher.update(prompt.encode())
+    return f"{model}:{hasher.hexdigest()}"
+
+
+def get_cached_response(key: str) -> Optional[str]:
+    """
+    キャッシュ済みのレスポンスを取得
+
+    Args:
+        key: make_key() で生成したキー
+
+    Returns:
+        レスポンステキスト（ない、または期限切れの場合はNone）
+    """
+    cache = _get_disk_cache()
+    if cache is not None:
+        return cache.get(key)
+
+    with _lock:
+        entry = _memory_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, text = entry
+        if expires_at < time.monotonic():
+            del _memory_cache[key]
+            return None
+        return text
+
+
+def set_cached_response(key: str, text: str, ttl: int = DEFAULT_TTL) -> None:
+    """
+    レスポンスをキャッシュに保存
+
+    Args:
+        key: make_key() で生成したキー
+        text: レスポンステキスト
+        ttl: 有効期限（秒）
+    """
+    cache = _get_disk_cache()
+    if cache is not None:
+        cache.set(key, text, expire=ttl)
+        return
+
+    with _lock:
+        if len(_memory_cache) >= _MEMORY_CACHE_MAX_ENTRIES and key not in _memory_cache:
+            # 最も古く登録されたものから捨てる
+            del _memory_cache[next(iter(_memory_cache))]
+        _memory_cache[key] = (time.monotonic() + ttl, text)
+
+
+def clear_llm_cache() -> None:
+    """キャッシュをすべて削除（明示的に再分析したい場合に使用）"""
+    cache = _get_disk_cache()
+    if cache is not None:
+        cache.clear()
+    with _lock:
+        _memory_cache.clear()
@@ -1,34 +1,40 @@
 """
 データモデル定義
 
-Pydanticを使用した型安全なデータ構造を定義します。
+外部入力を検証するモデル（Question, JournalEntry）はPydanticで、
+診断・分析の内部で大量に生成するモデルは slots 付きの dataclass で定義します。
 """
 
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from enum import Enum
-from typing import Optional
+from enum import IntEnum
+from typing import Any, Optional
 from zoneinfo import ZoneInfo
 
 from pydantic import BaseModel, Field
 
 
+# 日本時間のタイムゾーン（タイムスタンプの既定値を作るたびに引き直さない）
+_JST = ZoneInfo("Asia/Tokyo")
+
+
 def get_jst_now() -> datetime:
     """日本時間(JST)の現在時刻を取得"""
-    return datetime.now(ZoneInfo("Asia/Tokyo"))
+    return datetime.now(_JST)
 
 
-class Dimension(str, Enum):
-    """性格診断の4つの指標"""
-    EI = "EI"  # 外向(E) vs 内向(I)
-    SN = "SN"  # 感覚(S) vs 直観(N)
-    TF = "TF"  # 思考(T) vs 感情(F)
-    JP = "JP"  # 判断(J) vs 知覚(P)
+class Dimension(IntEnum):
+    """性格診断の4つの指標（表示・保存には .name を使う）"""
+    EI = 0  # 外向(E) vs 内向(I)
+    SN = 1  # 感覚(S) vs 直観(N)
+    TF = 2  # 思考(T) vs 感情(F)
+    JP = 3  # 判断(J) vs 知覚(P)
 
 
-class Direction(str, Enum):
-    """質問のスコア方向"""
-    POSITIVE = "positive"  # 高いスコアが第1タイプ(E, S, T, J)を示す
-    NEGATIVE = "negative"  # 高いスコアが第2タイプ(I, N, F, P)を示す
+class Direction(IntEnum):
+    """質問のスコア方向（値はそのまま第1タイプへの得点の符号として使える）"""
+    POSITIVE = 1  # 高いスコアが第1タイプ(E, S, T, J)を示す
+    NEGATIVE = -1  # 高いスコアが第2タイプ(I, N, F, P)を示す
 
 
 class Question(BaseModel):
@@ -39,54 +45,73 @@ class Question(BaseModel):
     direction: Direction = Field(..., description="スコアの方向")
 
 
-class UserResponse(BaseModel):
+# 性格タイプごとの通称
+_TYPE_NAMES: dict[str, str] = {
+    "INTJ": "建築家",
+    "INTP": "論理学者",
+    "ENTJ": "指揮官",
+    "ENTP": "討論者",
+    "INFJ": "提唱者",
+    "INFP": "仲介者",
+    "ENFJ": "主人公",
+    "ENFP": "広報運動家",
+    "ISTJ": "管理者",
+    "ISFJ": "擁護者",
+    "ESTJ": "幹部",
+    "ESFJ": "領事官",
+    "ISTP": "巨匠",
+    "ISFP": "冒険家",
+    "ESTP": "起業家",
+    "ESFP": "エンターテイナー",
+}
+
+
+class _DictMixin:
+    """dataclass を辞書に変換する to_dict() を提供"""
+    __slots__ = ()
+
+    def to_dict(self) -> dict[str, Any]:
+        """フィールドを辞書に変換（入れ子の dataclass も辞書になる）"""
+        return asdict(self)
+
+
+@dataclass(slots=True, kw_only=True)
+class UserResponse(_DictMixin):
     """ユーザーの回答"""
-    user_id: str = Field(..., description="ユーザーID")
-    question_id: int = Field(..., description="質問ID")
-    score: int = Field(..., ge=1, le=5, description="回答スコア（1-5）")
-    timestamp: datetime = Field(default_factory=get_jst_now, description="回答日時")
-
-
-class DimensionScore(BaseModel):
-    """各指標のスコア詳細"""
-    dimension: Dimension = Field(..., description="指標")
-    first_type: str = Field(..., description="第1タイプ（E, S, T, J）")
-    second_type: str = Field(..., description="第2タイプ（I, N, F, P）")
-    first_score: float = Field(..., description="第1タイプのスコア")
-    second_score: float = Field(..., description="第2タイプのスコア")
-    dominant_type: str = Field(..., description="優勢なタイプ")
-    strength_percent: float = Field(..., ge=0, le=100, description="強度（%）")
-
-
-class PersonalityResult(BaseModel):
+    user_id: str  # ユーザーID
+    question_id: int  # 質問ID
+    score: int  # 回答スコア（1-5）
+    timestamp: datetime = field(default_factory=get_jst_now)  # 回答日時
+
+    def __post_init__(self) -> None:
+        if not 1 <= self.score <= 5:
+            raise ValueError(f"回答スコアは1-5の範囲で指定してください: {self.score}")
+
+
+@dataclass(slots=True, frozen=True, kw_only=True)
+class DimensionScore(_DictMixin):
+    """各指標のスコア詳細（不変）"""
+    dimension: Dimension  # 指標
+    first_type: str  # 第1タイプ（E, S, T, J）
+    second_type: str  # 第2タイプ（I, N, F, P）
+    first_score: float  # 第1タイプのスコア
+    second_score: float  # 第2タイプのスコア
+    dominant_type: str  # 優勢なタイプ
+    strength_percent: float  # 強度（%、0-100）
+
+
+@dataclass(slots=True, kw_only=True)
+class PersonalityResult(_DictMixin):
     """性格診断結果"""
-    user_id: str = Field(..., description="ユーザーID")
-    personality_type: str = Field(..., min_length=4, max_length=4, description="4文字タイプ（例: INTJ）")
-    dimension_scores: list[DimensionScore] = Field(..., description="各指標の詳細スコア")
-    diagnosed_at: datetime = Field(default_factory=get_jst_now, description="診断日時")
+    user_id: str  # ユーザーID
+    personality_type: str  # 4文字タイプ（例: INTJ）
+    dimension_scores: list[DimensionScore]  # 各指標の詳細スコア
+    diagnosed_at: datetime = field(default_factory=get_jst_now)  # 診断日時
 
     @property
     def type_description(self) -> str:
         """タイプの簡易説明を返す"""
-        type_names: dict[str, str] = {
-            "INTJ": "建築家",
-            "INTP": "論理学者",
-            "ENTJ": "指揮官",
-            "ENTP": "討論者",
-            "INFJ": "提唱者",
-            "INFP": "仲介者",
-            "ENFJ": "主人公",
-            "ENFP": "広報運動家",
-            "ISTJ": "管理者",
-            "ISFJ": "擁護者",
-            "ESTJ": "幹部",
-            "ESFJ": "領事官",
-            "ISTP": "巨匠",
-            "ISFP": "冒険家",
-            "ESTP": "起業家",
-            "ESFP": "エンターテイナー",
-        }
-        return type_names.get(self.personality_type, "不明")
+        return _TYPE_NAMES.get(self.personality_type, "不明")
 
 
 class JournalEntry(BaseModel):
@@ -100,21 +125,23 @@ class JournalEntry(BaseModel):
     personality_type: Optional[str] = Field(None, description="作成時の性格タイプ")
 
 
-class BlindSpotInsight(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class BlindSpotInsight(_DictMixin):
     """盲点インサイト"""
-    category: str = Field(..., description="盲点のカテゴリ")
-    description: str = Field(..., description="盲点の説明")
-    evidence: list[str] = Field(default_factory=list, description="日記からの根拠")
-    recommendation: str = Field(..., description="改善のための提案")
-    severity: str = Field(..., description="深刻度（low/medium/high）")
+    category: str  # 盲点のカテゴリ
+    description: str  # 盲点の説明
+    evidence: list[str] = field(default_factory=list)  # 日記からの根拠
+    recommendation: str  # 改善のための提案
+    severity: str  # 深刻度（low/medium/high）
 
 
-class DynamicTypeProfile(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class DynamicTypeProfile(_DictMixin):
     """ダイナミック・タイプ・プロファイル"""
-    user_id: str = Field(..., description="ユーザーID")
-    base_type: str = Field(..., description="基本性格タイプ")
-    refined_description: str = Field(..., description="AIにより詳細化された説明")
-    validated_strengths: list[str] = Field(default_factory=list, description="日記で確認された強み")
-    observed_challenges: list[str] = Field(default_factory=list, description="日記で観察された課題")
-    estimated_axis_scores: dict[str, float] = Field(default_factory=dict, description="AI推定の指標スコア (0.0-1.0)")
-    last_updated: datetime = Field(default_factory=get_jst_now, description="最終更新日時")
+    user_id: str  # ユーザーID
+    base_type: str  # 基本性格タイプ
+    refined_description: str  # AIにより詳細化された説明
+    validated_strengths: list[str] = field(default_factory=list)  # 日記で確認された強み
+    observed_challenges: list[str] = field(default_factory=list)  # 日記で観察された課題
+    estimated_axis_scores: dict[str, float] = field(default_factory=dict)  # AI推定の指標スコア (0.0-1.0)
+    last_updated: datetime = field(default_factory=get_jst_now)  # 最終更新日時
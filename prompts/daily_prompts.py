@@ -5,6 +5,8 @@
 """
 
 import random
+from datetime import date
+from functools import lru_cache
 from typing import Optional
 
 
@@ -77,29 +79,82 @@ DEFAULT_PROMPTS: list[str] = [
 ]
 
 
-def get_daily_prompt(personality_type: Optional[str] = None) -> str:
+# 反対のタイプへの変換表（str.translate 用。タイプ文字以外はそのまま残る）
+_OPPOSITE_TRANS: dict[int, int] = str.maketrans("EISNTFJP", "IENSFTPJ")
+
+# 16タイプ
+_ALL_TYPES: tuple[str, ...] = tuple(
+    ei + sn + tf + jp for ei in "EI" for sn in "SN" for tf in "TF" for jp in "JP"
+)
+
+
+def _build_prompt_pool(type_chars: str) -> tuple[str, ...]:
+    """
+    タイプ文字それぞれのプロンプトを1つの候補にまとめる
+
+    各タイプのプロンプト数は同じなので、候補から1つ選ぶ確率は
+    「タイプ文字を選んでからプロンプトを選ぶ」場合と同じになる
+    """
+    return tuple(prompt for char in type_chars if char in TYPE_PROMPTS for prompt in TYPE_PROMPTS[char])
+
+
+_DEFAULT_POOL: tuple[str, ...] = tuple(DEFAULT_PROMPTS)
+
+# 16タイプそれぞれのプロンプト候補（インポート時に1回だけ構築）
+_FULL_TYPE_PROMPTS: dict[str, tuple[str, ...]] = {
+    personality_type: _build_prompt_pool(personality_type) for personality_type in _ALL_TYPES
+}
+
+# 16タイプそれぞれの反対タイプのプロンプト候補（get_balanced_prompt 用）
+_OPPOSITE_TYPE_PROMPTS: dict[str, tuple[str, ...]] = {
+    personality_type: _build_prompt_pool(personality_type.translate(_OPPOSITE_TRANS))
+    for personality_type in _ALL_TYPES
+}
+
+
+def _day_rng(user_id: str, today: date, personality_type: Optional[str]) -> random.Random:
+    """ユーザー・日付・タイプごとに決まった乱数列を返す（文字列シードはプロセスをまたいでも同じ値になる）"""
+    return random.Random(f"{user_id}:{today.toordinal()}:{personality_type}")
+
+
+def get_daily_prompt(
+    personality_type: Optional[str] = None,
+    user_id: Optional[str] = None,
+    today: Optional[date] = None,
+) -> str:
     """
     性格タイプに応じた日記プロンプトを取得
 
     Args:
         personality_type: 4文字の性格タイプ（例: "INTJ"）
+        user_id: ユーザーID（today と合わせて指定すると、同じ日は同じプロンプトを返す）
+        today: 日付
 
     Returns:
         str: 日記の問いかけ
     """
-    if personality_type is None:
-        return random.choice(DEFAULT_PROMPTS)
+    if user_id is not None and today is not None:
+        return _daily_prompt_for_day(personality_type, user_id, today)
+    return _pick_daily_prompt(personality_type, random)
+
 
-    # 最も強調すべきタイプを選択（ランダムに1つ）
-    available_types = [char for char in personality_type if char in TYPE_PROMPTS]
+@lru_cache(maxsize=4096)
+def _daily_prompt_for_day(personality_type: Optional[str], user_id: str, today: date) -> str:
+    """ユーザーと日付で固定した日記プロンプト（再実行ごとに選び直さない）"""
+    return _pick_daily_prompt(personality_type, _day_rng(user_id, today, personality_type))
 
-    if not available_types:
-        return random.choice(DEFAULT_PROMPTS)
 
-    selected_type = random.choice(available_types)
-    prompts = TYPE_PROMPTS[selected_type]
+def _pick_daily_prompt(personality_type: Optional[str], rng) -> str:
+    """rng（random モジュールまたは random.Random）で日記プロンプトを1つ選ぶ"""
+    if personality_type is None:
+        return rng.choice(_DEFAULT_POOL)
+
+    pool = _FULL_TYPE_PROMPTS.get(personality_type)
+    if pool is None:
+        # 16タイプ以外の文字列は、含まれるタイプ文字から候補を作る
+        pool = _build_prompt_pool(personality_type) or _DEFAULT_POOL
 
-    return random.choice(prompts)
+    return rng.choice(pool)
 
 
 def get_prompts_for_type(type_char: str) -> list[str]:
@@ -115,30 +170,43 @@ def get_prompts_for_type(type_char: str) -> list[str]:
     return TYPE_PROMPTS.get(type_char, DEFAULT_PROMPTS)
 
 
-def get_balanced_prompt(personality_type: str) -> str:
+def get_balanced_prompt(
+    personality_type: str,
+    user_id: Optional[str] = None,
+    today: Optional[date] = None,
+) -> str:
     """
     タイプのバランスを考慮したプロンプトを取得
     （弱い指標を意識的に刺激する）
 
     Args:
         personality_type: 4文字の性格タイプ
+        user_id: ユーザーID（today と合わせて指定すると、同じ日は同じプロンプトを返す）
+        today: 日付
 
     Returns:
         str: 日記の問いかけ
     """
-    # 反対のタイプのプロンプトをたまに提示する
-    opposite_types = {
-        "E": "I", "I": "E",
-        "S": "N", "N": "S",
-        "T": "F", "F": "T",
-        "J": "P", "P": "J",
-    }
+    if user_id is not None and today is not None:
+        return _balanced_prompt_for_day(personality_type, user_id, today)
+    return _pick_balanced_prompt(personality_type, random)
 
-    # 20%の確率で反対タイプのプロンプトを提示
-    if random.random() < 0.2:
-        selected_type = random.choice(list(personality_type))
-        opposite = opposite_types.get(selected_type)
-        if opposite and opposite in TYPE_PROMPTS:
-            return random.choice(TYPE_PROMPTS[opposite])
 
-    return get_daily_prompt(personality_type)
+@lru_cache(maxsize=4096)
+def _balanced_prompt_for_day(personality_type: str, user_id: str, today: date) -> str:
+    """ユーザーと日付で固定したバランス型プロンプト（再実行ごとに選び直さない）"""
+    return _pick_balanced_prompt(personality_type, _day_rng(user_id, today, personality_type))
+
+
+def _pick_balanced_prompt(personality_type: str, rng) -> str:
+    """rng（random モジュールまたは random.Random）でバランス型プロンプトを1つ選ぶ"""
+    # 20%の確率で反対タイプのプロンプトを提示
+    if rng.random() < 0.2:
+        opposite_pool = _OPPOSITE_TYPE_PROMPTS.get(personality_type)
+        if opposite_pool is None:
+            # タイプ文字以外は _build_prompt_pool で除外される
+            opposite_pool = _build_prompt_pool(personality_type.translate(_OPPOSITE_TRANS))
+        if opposite_pool:
+            return rng.choice(opposite_pool)
+
+    return _pick_daily_prompt(personality_type, rng)
@@ -4,6 +4,9 @@
 診断結果の詳細と盲点インサイトを表示します。
 """
 
+from itertools import compress
+from typing import Optional
+
 import streamlit as st
 import altair as alt
 
@@ -11,12 +14,10 @@ from database.db_manager import (
     delete_journal_entry,
     get_all_personality_results,
     get_journal_entries,
-    get_latest_personality,
+    get_journal_revision,
+    get_user_bundle,
     save_ai_analysis_result,
-    get_latest_ai_analysis,
-    get_latest_ai_analysis,
     get_all_ai_analyses,
-    get_dynamic_profile,
 )
 from logic.analysis import (
     detect_blind_spots,
@@ -25,13 +26,20 @@ from logic.analysis import (
 )
 from logic.diagnostic import get_dimension_explanation
 from logic.ai_analyzer import (
-    analyze_journals_with_ai,
+    a_analyze_journals_with_ai,
+    a_generate_comprehensive_profile,
     is_api_configured,
     AIAnalysisResult,
-    generate_comprehensive_profile,
+    run_concurrently,
+)
+from models.data_models import DynamicTypeProfile, PersonalityResult
+from ui.styles import (
+    get_emotion_emoji,
+    get_hero_card,
+    get_info_banner,
+    get_metric_card,
+    get_section_header,
 )
-from models.data_models import PersonalityResult
-from ui.styles import get_hero_card, get_section_header, get_info_banner, get_metric_card
 
 
 def render_analysis_page() -> None:
@@ -60,8 +68,9 @@ def render_analysis_page() -> None:
 
     user_id = st.session_state.get("user_id", "default_user")
 
-    # 最新の診断結果を取得
-    personality = get_latest_personality(user_id)
+    # 最新の診断結果・AI分析結果・プロファイル・直近のジャーナルを1つの接続でまとめて取得
+    bundle = get_user_bundle(user_id)
+    personality = bundle["personality"]
 
     if personality is None:
         st.markdown("""
@@ -90,10 +99,11 @@ def render_analysis_page() -> None:
         return
 
     # タブで分析内容を分ける（AI分析とタイプ詳細を統合）
+    # 各タブはフラグメントなので、タブ内の操作ではそのタブだけが再実行される
     tab1, tab2, tab3 = st.tabs(["📊 総合分析", "🎯 盲点検知", "📚 ジャーナル記録"])
 
     with tab1:
-        render_unified_analysis(user_id, personality)
+        render_unified_analysis(user_id, personality, bundle)
 
     with tab2:
         render_blind_spots(user_id, personality)
@@ -102,8 +112,16 @@ def render_analysis_page() -> None:
         render_journal_summary(user_id)
 
 
-def render_unified_analysis(user_id: str, personality: PersonalityResult) -> None:
-    """統合された分析画面をレンダリング"""
+@st.fragment
+def render_unified_analysis(user_id: str, personality: PersonalityResult, bundle: dict) -> None:
+    """
+    統合された分析画面をレンダリング
+
+    Args:
+        user_id: ユーザーID
+        personality: 最新の性格診断結果
+        bundle: get_user_bundle() の結果（AI分析結果・プロファイル・直近のジャーナル）
+    """
     # セクションヘッダー
     st.markdown(get_section_header(
         "📊",
@@ -121,9 +139,9 @@ def render_unified_analysis(user_id: str, personality: PersonalityResult) -> Non
         ), unsafe_allow_html=True)
         return
     
-    # ジャーナルを取得
-    journals = get_journal_entries(user_id, limit=50)
-    
+    # 直近のジャーナル
+    journals = bundle["journals"]
+
     if not journals:
         st.markdown("""
         <div style="
@@ -147,9 +165,11 @@ def render_unified_analysis(user_id: str, personality: PersonalityResult) -> Non
                 st.rerun()
         return
     
-    # セッション状態で分析結果を管理
-    if "ai_analysis_result" not in st.session_state:
-        st.session_state.ai_analysis_result = None
+    # セッション状態で分析結果を管理（DBの最新結果はユーザーごとに1回だけ読み込んで変換する）
+    if st.session_state.get("ai_analysis_user_id") != user_id:
+        latest = bundle["analysis"]
+        st.session_state.ai_analysis_result = AIAnalysisResult(**latest) if latest else None
+        st.session_state.ai_analysis_user_id = user_id
     if "ai_analysis_error" not in st.session_state:
         st.session_state.ai_analysis_error = None
     
@@ -178,24 +198,27 @@ def render_unified_analysis(user_id: str, personality: PersonalityResult) -> Non
     
     if st.button("🚀 最新の状態で分析を実行", type="primary", use_container_width=True):
         with st.spinner("AIが分析中です...（ジャーナル量により30秒〜1分程度かかります）"):
-            # 1. 一般的な分析
-            result, error = analyze_journals_with_ai(
-                journals,
-                personality.personality_type
-            )
-            
-            # 2. ダイナミック・プロファイルの再生成
-            if not error:
-                _, profile_error = generate_comprehensive_profile(
+            # 1. 一般的な分析 と 2. ダイナミック・プロファイルの再生成 を同時に実行
+            # （明示的な再分析なので、LLMレスポンスのキャッシュは使わない）
+            (result, error), (_, profile_error) = run_concurrently(
+                a_analyze_journals_with_ai(
+                    journals,
+                    personality.personality_type,
+                    use_cache=False,
+                ),
+                a_generate_comprehensive_profile(
                     user_id,
                     personality.personality_type,
-                    journals
-                )
-                if profile_error:
-                    print(f"Profile generation error: {profile_error}")
+                    journals,
+                    use_cache=False,
+                ),
+            )
+            if profile_error:
+                print(f"Profile generation error: {profile_error}")
             
-            # 結果保存
-            st.session_state.ai_analysis_result = result
+            # 結果保存（失敗した場合は直前の結果を表示し続ける）
+            if result:
+                st.session_state.ai_analysis_result = result
             st.session_state.ai_analysis_error = error
             
             if result and not error:
@@ -222,7 +245,7 @@ def render_unified_analysis(user_id: str, personality: PersonalityResult) -> Non
     # --- 分析結果の表示 ---
     
     # 1. ダイナミック・タイプ・プロファイル（最優先表示）
-    dynamic_profile = get_dynamic_profile(user_id)
+    dynamic_profile = bundle["profile"]
     if dynamic_profile:
         st.markdown("---")
         st.subheader(f"🔄 {personality.personality_type}のあなた：パーソナライズ分析")
@@ -251,17 +274,6 @@ def render_unified_analysis(user_id: str, personality: PersonalityResult) -> Non
 
     # 2. 直近のAI分析結果（あれば）
     result = st.session_state.ai_analysis_result
-    if not result:
-        # セッションになければDBから最新を取得
-        latest = get_latest_ai_analysis(user_id)
-        if latest:
-            # 辞書からオブジェクトに変換
-            result = AIAnalysisResult(**latest)
-            # analyzed_atが文字列なら変換（念のため）
-            if isinstance(result.analyzed_at, str):
-                from datetime import datetime
-                result.analyzed_at = datetime.fromisoformat(result.analyzed_at)
-    
     if result:
         st.markdown("---")
         st.subheader("📊 深層心理・行動分析")
@@ -291,7 +303,7 @@ def render_unified_analysis(user_id: str, personality: PersonalityResult) -> Non
 
     # 3. 基本診断データの詳細（参考情報として下部に配置）
     with st.expander("📊 基本診断データの詳細（スコア・理論値）を見る"):
-        _render_static_type_details(personality)
+        _render_static_type_details(personality, dynamic_profile)
 
 
 def _render_axis_comparison(
@@ -307,65 +319,65 @@ def _render_axis_comparison(
         ("知覚(P) / 判断(J)", "JP", "J", "P"),
     ]
     
-    # 凡例を表示
-    st.markdown("""
-    <div style="display: flex; gap: 20px; margin-bottom: 20px; font-size: 0.9em;">
-        <div style="display: flex; align-items: center;">
-            <div style="width: 12px; height: 12px; background-color: #4c7bf4; border-radius: 50%; border: 2px solid white; box-shadow: 0 1px 3px rgba(0,0,0,0.2); margin-right: 6px;"></div>
-            <span>診断結果（ベース）</span>
-        </div>
-        <div style="display: flex; align-items: center;">
-            <div style="width: 12px; height: 12px; background-color: #ff6b6b; border-radius: 50%; border: 2px solid white; box-shadow: 0 1px 3px rgba(0,0,0,0.2); margin-right: 6px;"></div>
-            <span>日々の振る舞い（実態）</span>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    scores_by_code = {ds.dimension.name: ds for ds in personality.dimension_scores}
 
+    # 凡例と4軸ぶんのバーを1つのHTMLにまとめて1回で描画する
+    rows = []
     for label, code, left, right in axes:
         # 1. 診断スコアの計算 (0.0=Left, 1.0=Right)
-        # 該当するDimensionScoreを探す
         diag_val = 0.5
-        for ds in personality.dimension_scores:
-            if ds.dimension.name == code:
-                # dominant_typeがLeft側(E, S, T, J)なら 0.5 - (percent/200)
-                # Right側(I, N, F, P)なら 0.5 + (percent/200)
-                if ds.dominant_type == left:
-                    diag_val = 0.5 - (ds.strength_percent / 200)
-                else:
-                    diag_val = 0.5 + (ds.strength_percent / 200)
-                break
-        
+        ds = scores_by_code.get(code)
+        if ds is not None:
+            # dominant_typeがLeft側(E, S, T, J)なら左へ、Right側(I, N, F, P)なら右へ percent/200 だけずらす
+            sign = -1 if ds.dominant_type == left else 1
+            diag_val = 0.5 + sign * ds.strength_percent / 200
+
         # 2. 推定スコア
         est_val = estimated_scores.get(code, 0.5)
-        
-        # 3. 差分表示
-        col1, col2, col3 = st.columns([1, 4, 1])
-        with col1:
-            st.markdown(f"**{left}**")
-        with col3:
-            st.markdown(f"**{right}**", unsafe_allow_html=True) # 右寄せ等はCSSで調整可能だが今回は簡易的に
-            
-        with col2:
-            # バーの背景
-            bar_html = f"""
-            <div style="position: relative; width: 100%; height: 30px; background-color: #f0f2f6; border-radius: 15px; margin-bottom: 8px; box-shadow: inset 0 1px 3px rgba(0,0,0,0.05);">
+
+        # 3. 差分表示（左右のタイプ名とバー）
+        rows.append(f"""
+            <div style="font-weight: 700;">{left}</div>
+            <div style="position: relative; width: 100%; height: 30px; background-color: #f0f2f6; border-radius: 15px; box-shadow: inset 0 1px 3px rgba(0,0,0,0.05);">
                 <div style="position: absolute; left: 50%; top: 5px; bottom: 5px; width: 1px; background-color: #d1d5db;"></div>
                 <div style="position: absolute; left: {diag_val*100}%; top: 50%; width: 16px; height: 16px; background-color: #4c7bf4; border-radius: 50%; transform: translate(-50%, -50%); border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.15); z-index: 1;" title="診断結果: {left if diag_val < 0.5 else right}"></div>
                 <div style="position: absolute; left: {est_val*100}%; top: 50%; width: 16px; height: 16px; background-color: #ff6b6b; border-radius: 50%; transform: translate(-50%, -50%); border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.15); z-index: 2;" title="実態: {left if est_val < 0.5 else right}"></div>
             </div>
-            """
-            st.markdown(bar_html.replace('\n', ''), unsafe_allow_html=True)
-            
-            # 変化の解説
-            diff = est_val - diag_val
-            if abs(diff) > 0.2:
-                # 20%以上のズレがある場合
-                direction = right if diff > 0 else left
-                st.caption(f"📢 最近は **{direction}** の傾向が強く出ています")
+            <div style="font-weight: 700; text-align: right;">{right}</div>
+        """)
 
+        # 変化の解説
+        diff = est_val - diag_val
+        if abs(diff) > 0.2:
+            # 20%以上のズレがある場合
+            direction = right if diff > 0 else left
+            rows.append(f"""
+            <div style="grid-column: 2; margin-top: -4px; color: #718096; font-size: 0.85em;">📢 最近は <strong>{direction}</strong> の傾向が強く出ています</div>
+            """)
 
-def _render_static_type_details(personality: PersonalityResult) -> None:
-    """タイプ詳細を表示"""
+    html = f"""
+    <div style="display: flex; gap: 20px; margin-bottom: 20px; font-size: 0.9em;">
+        <div style="display: flex; align-items: center;">
+            <div style="width: 12px; height: 12px; background-color: #4c7bf4; border-radius: 50%; border: 2px solid white; box-shadow: 0 1px 3px rgba(0,0,0,0.2); margin-right: 6px;"></div>
+            <span>診断結果（ベース）</span>
+        </div>
+        <div style="display: flex; align-items: center;">
+            <div style="width: 12px; height: 12px; background-color: #ff6b6b; border-radius: 50%; border: 2px solid white; box-shadow: 0 1px 3px rgba(0,0,0,0.2); margin-right: 6px;"></div>
+            <span>日々の振る舞い（実態）</span>
+        </div>
+    </div>
+    <div style="display: grid; grid-template-columns: 1fr 4fr 1fr; gap: 8px 16px; align-items: center;">
+        {"".join(rows)}
+    </div>
+    """
+    st.markdown(html.replace("\n", ""), unsafe_allow_html=True)
+
+
+def _render_static_type_details(
+    personality: PersonalityResult,
+    dynamic_profile: Optional[DynamicTypeProfile],
+) -> None:
+    """タイプ詳細を表示（dynamic_profile は呼び出し元で取得済みのものを使う）"""
     st.markdown(f"""
     ## あなたのタイプ: **{personality.personality_type}**
     ### {personality.type_description}
@@ -377,7 +389,7 @@ def _render_static_type_details(personality: PersonalityResult) -> None:
     st.markdown("### 📊 指標別スコア")
 
     for score in personality.dimension_scores:
-        st.markdown(f"#### {score.dimension.value}: {score.first_type} vs {score.second_type}")
+        st.markdown(f"#### {score.dimension.name}: {score.first_type} vs {score.second_type}")
 
         col1, col2, col3 = st.columns([1, 3, 1])
 
@@ -404,7 +416,6 @@ def _render_static_type_details(personality: PersonalityResult) -> None:
             st.markdown(f"**強度**: {score.strength_percent:.1f}%")
 
     # --- ダイナミック・プロファイルの表示 ---
-    dynamic_profile = get_dynamic_profile(personality.user_id)
     if dynamic_profile:
         st.markdown("---")
         st.markdown("### 🔄 AIによる性格詳細（日記分析ベース）")
@@ -447,14 +458,42 @@ def _render_static_type_details(personality: PersonalityResult) -> None:
     st.markdown(challenge_chips)
 
 
+@st.cache_data(ttl=600, show_spinner=False)
+def _load_blind_spots(
+    user_id: str,
+    personality_type: str,
+    journal_revision: int,
+    _personality: PersonalityResult,
+) -> tuple[int, list]:
+    """
+    直近のジャーナルから盲点を検出する（タイプとジャーナルが変わらない間は結果を使い回す）
+
+    Args:
+        user_id: ユーザーID
+        personality_type: 性格タイプ（キャッシュキー）
+        journal_revision: get_journal_revision(user_id) の値（キャッシュキー）
+        _personality: 性格診断結果（キャッシュキーには含めない）
+
+    Returns:
+        (分析対象のジャーナル件数, 検出された盲点のリスト)
+    """
+    journals = get_journal_entries(user_id, limit=50)
+    if not journals:
+        return 0, []
+    return len(journals), detect_blind_spots(_personality, journals)
+
+
+@st.fragment
 def render_blind_spots(user_id: str, personality: PersonalityResult) -> None:
     """盲点インサイトを表示"""
     st.markdown("## 🎯 盲点検知")
 
-    # ジャーナルを取得
-    journals = get_journal_entries(user_id, limit=50)
+    # ジャーナルを取得して盲点検知を実行
+    journal_count, insights = _load_blind_spots(
+        user_id, personality.personality_type, get_journal_revision(user_id), personality
+    )
 
-    if not journals:
+    if not journal_count:
         st.info("""
         盲点を検知するには、ジャーナルのデータが必要です。
 
@@ -467,10 +506,7 @@ def render_blind_spots(user_id: str, personality: PersonalityResult) -> None:
             st.rerun()
         return
 
-    st.markdown(f"📝 分析対象: {len(journals)}件のジャーナルエントリー")
-
-    # 盲点検知を実行
-    insights = detect_blind_spots(personality, journals)
+    st.markdown(f"📝 分析対象: {journal_count}件のジャーナルエントリー")
 
     if not insights:
         st.success("""
@@ -514,10 +550,82 @@ def render_blind_spots(user_id: str, personality: PersonalityResult) -> None:
     """)
 
 
+@st.cache_data(ttl=300, show_spinner=False)
+def _load_journal_summary(user_id: str, journal_revision: int):
+    """
+    ジャーナルの要約に使うデータを取得・集計する
+
+    検索欄の入力などによる再実行では同じ結果を使い回し、
+    ジャーナルが変更されたら journal_revision が変わるので作り直す
+
+    Args:
+        user_id: ユーザーID
+        journal_revision: get_journal_revision(user_id) の値（キャッシュキー）
+
+    Returns:
+        (エントリーのリスト, エントリーごとのDataFrame, 日別平均のDataFrame, よく使うタグ上位10件のSeries)。
+        エントリーがない場合はDataFrameなどはNone
+    """
+    import pandas as pd
+    from collections import Counter
+
+    # 全ジャーナルを取得（limitを大きく設定）
+    entries = get_journal_entries(user_id, limit=1000)
+    if not entries:
+        return entries, None, None, None
+
+    # DataFrame作成
+    df = pd.DataFrame([
+        {
+            "date": e.date,
+            "emotion": e.emotion_score,
+            "length": len(e.content),
+            "tags": e.tags,
+            # キーワード検索用に内容とタグを小文字にしてまとめておく
+            # （区切りの\0は検索語に含まれないので、内容とタグをまたいで一致することはない）
+            "search_text": "\0".join([e.content, *e.tags]).lower(),
+            # 一覧表の表示用
+            "date_label": e.date.strftime('%Y/%m/%d (%a)'),
+            "emotion_label": f"{get_emotion_emoji(e.emotion_score)} {e.emotion_score}",
+            "tags_label": ", ".join(e.tags),
+            "preview": e.content[:50] + "..." if len(e.content) > 50 else e.content,
+        }
+        for e in entries
+    ])
+    # dateをdatetime型に変換
+    df["date"] = pd.to_datetime(df["date"])
+    # 日付ごとの平均（同日に複数ある場合）
+    daily_df = df.groupby(df["date"].dt.date)["emotion"].mean().reset_index()
+    daily_df["date"] = pd.to_datetime(daily_df["date"])
+
+    tag_counts = Counter(tag for tags in df["tags"] for tag in tags if tag)
+    top_tags = pd.Series(tag_counts).sort_values(ascending=False).head(10) if tag_counts else None
+    return entries, df, daily_df, top_tags
+
+
+@st.cache_resource(ttl=300, max_entries=100, show_spinner=False)
+def _build_emotion_chart(user_id: str, journal_revision: int, _daily_df) -> alt.Chart:
+    """
+    気分推移のAltairチャートを作成する（キーは _load_journal_summary と同じ）
+
+    Args:
+        user_id: ユーザーID
+        journal_revision: get_journal_revision(user_id) の値（キャッシュキー）
+        _daily_df: 日別平均のDataFrame（キャッシュキーには含めない）
+    """
+    return alt.Chart(_daily_df).mark_line(point=True).encode(
+        x=alt.X("date:T", title="日付", axis=alt.Axis(format="%Y/%m/%d")),
+        y=alt.Y("emotion:Q", title="気分 (1-10)", scale=alt.Scale(domain=[1, 10])),
+        tooltip=[alt.Tooltip("date:T", title="日付", format="%Y/%m/%d"), alt.Tooltip("emotion:Q", title="気分", format=".1f")]
+    ).properties(
+        title="日々の気分推移"
+    )
+
+
+@st.fragment
 def render_journal_summary(user_id: str) -> None:
     """ジャーナルの要約と履歴を表示"""
     import pandas as pd
-    from collections import Counter
 
     # セクションヘッダー
     st.markdown(get_section_header(
@@ -526,8 +634,8 @@ def render_journal_summary(user_id: str) -> None:
         "あなたの記録の全体像を可視化"
     ), unsafe_allow_html=True)
 
-    # 全ジャーナルを取得（limitを大きく設定）
-    entries = get_journal_entries(user_id, limit=1000)
+    journal_revision = get_journal_revision(user_id)
+    entries, df, daily_df, top_tags = _load_journal_summary(user_id, journal_revision)
 
     if not entries:
         st.markdown("""
@@ -552,22 +660,6 @@ def render_journal_summary(user_id: str) -> None:
                 st.rerun()
         return
 
-    # DataFrame作成
-    df = pd.DataFrame([
-        {
-            "date": e.date,
-            "emotion": e.emotion_score,
-            "length": len(e.content),
-            "tags": e.tags
-        }
-        for e in entries
-    ])
-    # dateをdatetime型に変換
-    df["date"] = pd.to_datetime(df["date"])
-    # 日付ごとの平均（同日に複数ある場合）
-    daily_df = df.groupby(df["date"].dt.date)["emotion"].mean().reset_index()
-    daily_df["date"] = pd.to_datetime(daily_df["date"])
-
     # --- 統計情報 ---
     avg_emotion = df["emotion"].mean()
     first_date = df["date"].min().date()
@@ -597,23 +689,15 @@ def render_journal_summary(user_id: str) -> None:
     with col_chart1:
         st.markdown("### 📈 気分の推移")
         
-        # Altairチャートの作成
-        chart = alt.Chart(daily_df).mark_line(point=True).encode(
-            x=alt.X("date:T", title="日付", axis=alt.Axis(format="%Y/%m/%d")),
-            y=alt.Y("emotion:Q", title="気分 (1-10)", scale=alt.Scale(domain=[1, 10])),
-            tooltip=[alt.Tooltip("date:T", title="日付", format="%Y/%m/%d"), alt.Tooltip("emotion:Q", title="気分", format=".1f")]
-        ).properties(
-            title="日々の気分推移"
-        )
+        # Altairチャートの作成（ジャーナルが変わるまでは作成済みのものを使う）
+        chart = _build_emotion_chart(user_id, journal_revision, daily_df)
         # interactive() を呼ばなければ拡大縮小不可になる
         st.altair_chart(chart, use_container_width=True)
 
     with col_chart2:
         st.markdown("### 🏷️ よく使うタグ")
-        all_tags = [tag for tags in df["tags"] for tag in tags if tag]
-        if all_tags:
-            tag_counts = Counter(all_tags)
-            st.bar_chart(pd.Series(tag_counts).sort_values(ascending=False).head(10))
+        if top_tags is not None:
+            st.bar_chart(top_tags)
         else:
             st.caption("タグが使用されていません")
 
@@ -622,51 +706,59 @@ def render_journal_summary(user_id: str) -> None:
     # --- 全履歴リスト ---
     st.markdown("### 📝 全エントリー一覧")
     
-    # フィルタリング機能
-    search_query = st.text_input("🔍 キーワード検索", placeholder="内容やタグで検索...")
+    # フィルタリング機能（検索ボタンかEnterで確定したときだけ再実行する）
+    with st.form("journal_search", clear_on_submit=False, border=False):
+        st.text_input("🔍 キーワード検索", placeholder="内容やタグで検索...", key="journal_search_query")
+        st.form_submit_button("検索")
+    search_query = st.session_state.get("journal_search_query", "")
     
     filtered_entries = entries
+    filtered_df = df
     if search_query:
-        query = search_query.lower()
-        filtered_entries = [
-            e for e in entries 
-            if query in e.content.lower() or 
-            any(query in t.lower() for t in e.tags)
-        ]
+        # 前もって小文字化した検索用の列を一括で照合する（df の行は entries と同じ順）
+        matches = df["search_text"].str.contains(search_query.lower(), regex=False)
+        filtered_entries = list(compress(entries, matches))
+        filtered_df = df[matches]
         st.caption(f"{len(filtered_entries)}件が見つかりました")
 
-    # リスト表示
-    for entry in filtered_entries:
-        date_str = entry.date.strftime('%Y/%m/%d (%a)')
-        emotion_emoji = get_emotion_emoji(entry.emotion_score)
-        
-        with st.expander(f"{date_str} {emotion_emoji} (気分: {entry.emotion_score})"):
-            st.markdown(entry.content)
-            
-            if entry.tags:
-                st.markdown(f"🏷️ **タグ**: {', '.join(entry.tags)}")
-            
-            if entry.personality_type:
-                st.caption(f"当時のタイプ: {entry.personality_type}")
-            
-            # 削除ボタン
-            if st.button("🗑️ このエントリーを削除", key=f"del_summary_{entry.id}"):
-                if delete_journal_entry(entry.id):
-                    st.success("エントリーを削除しました")
-                    st.rerun()
-                else:
-                    st.error("削除に失敗しました")
-
-
-def get_emotion_emoji(score: int) -> str:
-    """感情スコアに対応する絵文字を取得"""
-    if score >= 9:
-        return "🎉"
-    elif score >= 7:
-        return "😃"
-    elif score >= 5:
-        return "🙂"
-    elif score >= 3:
-        return "😐"
-    else:
-        return "😔"
+    # 一覧は1つの表で表示し、選択したエントリーだけ詳細と削除ボタンを出す
+    # 選択は表の行番号なので、検索語かジャーナルが変わったら別の表として選択をリセットする
+    # （前の選択が別のエントリーを指して、違う行を削除してしまわないように）
+    event = st.dataframe(
+        filtered_df[["date_label", "emotion_label", "tags_label", "preview"]],
+        column_config={
+            "date_label": "日付",
+            "emotion_label": "気分",
+            "tags_label": "タグ",
+            "preview": "内容",
+        },
+        hide_index=True,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key=f"journal_summary_table:{journal_revision}:{search_query}",
+    )
+    selected_rows = event.selection.rows
+    if not selected_rows or selected_rows[0] >= len(filtered_entries):
+        st.caption("行を選択すると、エントリーの全文を表示できます")
+        return
+
+    entry = filtered_entries[selected_rows[0]]
+    emotion_emoji = get_emotion_emoji(entry.emotion_score)
+
+    with st.expander(f"{entry.date.strftime('%Y/%m/%d (%a)')} {emotion_emoji} (気分: {entry.emotion_score})", expanded=True):
+        st.markdown(entry.content)
+
+        if entry.tags:
+            st.markdown(f"🏷️ **タグ**: {', '.join(entry.tags)}")
+
+        if entry.personality_type:
+            st.caption(f"当時のタイプ: {entry.personality_type}")
+
+        # 削除ボタン
+        if st.button("🗑️ このエントリーを削除", key=f"del_summary_{entry.id}"):
+            if delete_journal_entry(entry.id, entry.user_id):
+                st.success("エントリーを削除しました")
+                st.rerun()
+            else:
+                st.error("削除に失敗しました")
@@ -18,10 +18,15 @@ from database.db_manager import (
     update_journal_entry,
 )
 from logic.tagging import suggest_tags
-from logic.ai_analyzer import get_journal_feedback, is_api_configured, refine_profile_with_journal
+from logic.ai_analyzer import (
+    a_refine_profile_with_journal,
+    is_api_configured,
+    run_in_background,
+    stream_journal_feedback,
+)
 from models.data_models import JournalEntry
 from prompts.daily_prompts import get_daily_prompt, get_balanced_prompt
-from ui.styles import get_hero_card, get_section_header, get_info_banner
+from ui.styles import get_emotion_emoji, get_hero_card, get_section_header, get_info_banner
 
 
 def init_journal_state() -> None:
@@ -72,55 +77,87 @@ def render_journal_page() -> None:
         render_journal_history(user_id)
 
 
-def render_journal_form(user_id: str) -> None:
-    """ジャーナル入力フォーム"""
-    # AIフィードバックがあれば表示（改善されたカード形式）
-    if "ai_feedback" in st.session_state and st.session_state.ai_feedback:
-        st.markdown(f"""
+def _feedback_card_html(text: str) -> str:
+    """AIフィードバックのカードHTMLを生成"""
+    return f"""
+    <div style="
+        background: linear-gradient(135deg, rgba(102, 126, 234, 0.2) 0%, rgba(118, 75, 162, 0.2) 100%);
+        border: 1px solid rgba(102, 126, 234, 0.3);
+        border-radius: 16px;
+        padding: 1.5rem;
+        margin-bottom: 1.5rem;
+        position: relative;
+        overflow: hidden;
+    ">
         <div style="
-            background: linear-gradient(135deg, rgba(102, 126, 234, 0.2) 0%, rgba(118, 75, 162, 0.2) 100%);
-            border: 1px solid rgba(102, 126, 234, 0.3);
-            border-radius: 16px;
-            padding: 1.5rem;
-            margin-bottom: 1.5rem;
-            position: relative;
-            overflow: hidden;
+            position: absolute;
+            top: -20px;
+            right: -20px;
+            font-size: 4rem;
+            opacity: 0.1;
+        ">💬</div>
+        <div style="
+            display: flex;
+            align-items: center;
+            gap: 0.75rem;
+            margin-bottom: 1rem;
         ">
             <div style="
-                position: absolute;
-                top: -20px;
-                right: -20px;
-                font-size: 4rem;
-                opacity: 0.1;
-            ">💬</div>
-            <div style="
+                width: 40px;
+                height: 40px;
+                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                border-radius: 50%;
                 display: flex;
                 align-items: center;
-                gap: 0.75rem;
-                margin-bottom: 1rem;
-            ">
-                <div style="
-                    width: 40px;
-                    height: 40px;
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    border-radius: 50%;
-                    display: flex;
-                    align-items: center;
-                    justify-content: center;
-                    font-size: 1.25rem;
-                ">🤖</div>
-                <div>
-                    <div style="font-weight: 600; color: #e2e8f0;">AIカウンセラーからのメッセージ</div>
-                    <div style="font-size: 0.75rem; color: #a0aec0;">あなたのジャーナルを読んで</div>
-                </div>
+                justify-content: center;
+                font-size: 1.25rem;
+            ">🤖</div>
+            <div>
+                <div style="font-weight: 600; color: #e2e8f0;">AIカウンセラーからのメッセージ</div>
+                <div style="font-size: 0.75rem; color: #a0aec0;">あなたのジャーナルを読んで</div>
             </div>
-            <div style="
-                color: #e2e8f0;
-                line-height: 1.7;
-                font-size: 0.95rem;
-            ">{st.session_state.ai_feedback}</div>
         </div>
-        """, unsafe_allow_html=True)
+        <div style="
+            color: #e2e8f0;
+            line-height: 1.7;
+            font-size: 0.95rem;
+        ">{text}</div>
+    </div>
+    """
+
+
+def _stream_feedback(content: str, emotion_score: int, personality_type: str | None) -> None:
+    """AIフィードバックを生成しながらカードに表示し、完成したものをセッションに保存"""
+    stream, error_msg = stream_journal_feedback(content, emotion_score, personality_type)
+    if stream is None:
+        if error_msg:
+            st.session_state.ai_feedback_error = error_msg
+        return
+
+    placeholder = st.empty()
+    text = ""
+    try:
+        for chunk in stream:
+            text += chunk
+            placeholder.markdown(_feedback_card_html(text), unsafe_allow_html=True)
+    except Exception as e:
+        st.session_state.ai_feedback_error = str(e)
+        text = ""
+    # 完成したフィードバックは下の通常表示（閉じるボタン付き）で表示する
+    placeholder.empty()
+    st.session_state.ai_feedback = text.strip() or None
+
+
+def render_journal_form(user_id: str) -> None:
+    """ジャーナル入力フォーム"""
+    # 保存直後はAIフィードバックを生成しながら表示
+    pending_feedback = st.session_state.pop("pending_feedback", None)
+    if pending_feedback is not None:
+        _stream_feedback(**pending_feedback)
+
+    # AIフィードバックがあれば表示（改善されたカード形式）
+    if "ai_feedback" in st.session_state and st.session_state.ai_feedback:
+        st.markdown(_feedback_card_html(st.session_state.ai_feedback), unsafe_allow_html=True)
         
         if st.button("✨ メッセージを閉じる", key="close_feedback"):
             st.session_state.ai_feedback = None
@@ -131,9 +168,11 @@ def render_journal_form(user_id: str) -> None:
     personality_result = get_latest_personality(user_id)
     personality_type = personality_result.personality_type if personality_result else None
 
-    # 動的プロンプトの表示
+    now_jst = datetime.now(ZoneInfo("Asia/Tokyo"))
+
+    # 動的プロンプトの表示（同じ日は再実行しても同じ問いかけを表示する）
     if personality_type:
-        prompt = get_balanced_prompt(personality_type)
+        prompt = get_balanced_prompt(personality_type, user_id=user_id, today=now_jst.date())
         st.markdown(f"""
         <div style="
             background: linear-gradient(135deg, rgba(79, 172, 254, 0.1) 0%, rgba(0, 242, 254, 0.05) 100%);
@@ -167,7 +206,6 @@ def render_journal_form(user_id: str) -> None:
     existing_tags = get_all_tags(user_id)
 
     # 日付選択（key追加）
-    now_jst = datetime.now(ZoneInfo("Asia/Tokyo"))
     st.date_input(
         "📅 日付",
         value=now_jst.date(),
@@ -267,39 +305,25 @@ def render_journal_form(user_id: str) -> None:
             save_journal_entry(entry)
             st.toast("✅ ジャーナルを保存しました！", icon="💾")
             
-            # AIフィードバックを取得（APIが設定されている場合）
-            # 注意: コールバック内での spinner 表示は動作しない場合があるため、
-            # 次回のレンダリングで処理するか、ここではシンプルに実行する
+            # AIフィードバックの取得とダイナミック・プロファイルの更新（APIが設定されている場合）
+            # フィードバックはコールバック内では逐次表示できないため、次回のレンダリングで
+            # 生成しながら表示する。プロフィール更新はその間バックグラウンドで実行する
             if is_api_configured():
-                try:
-                    # 同期的に実行（spinnerなし）
-                    feedback, error_msg = get_journal_feedback(
-                        content.strip(),
-                        emotion_val,
-                        personality_type,
-                    )
-                    if feedback:
-                        st.session_state.ai_feedback = feedback
-                    elif error_msg:
-                        st.session_state.ai_feedback_error = error_msg
-                except Exception as e:
-                    st.session_state.ai_feedback_error = str(e)
-            
-            # ダイナミック・プロファイルの更新（バックグラウンド的に実行）
-            if is_api_configured() and personality_type:
-                try:
+                st.session_state.pending_feedback = {
+                    "content": content.strip(),
+                    "emotion_score": emotion_val,
+                    "personality_type": personality_type,
+                }
+                if personality_type:
                     # ユーザーに処理中であることを伝える（トースト）
                     st.toast("性格プロフィールを更新中...", icon="🔄")
-                    _, ref_error = refine_profile_with_journal(
-                        user_id,
-                        personality_type,
-                        entry
+                    st.session_state.profile_refine_future = run_in_background(
+                        a_refine_profile_with_journal(
+                            user_id,
+                            personality_type,
+                            entry
+                        )
                     )
-                    if not ref_error:
-                        st.toast("性格プロフィールが詳細化されました！", icon="✨")
-                except Exception as e:
-                    # プロファイル更新のエラーはユーザー体験を阻害しないようログのみ（または無視）
-                    print(f"Profile update error: {e}")
 
             # フォームクリア
             st.session_state.journal_content_area = ""
@@ -319,6 +343,20 @@ def render_journal_form(user_id: str) -> None:
         # 一度表示したら消す
         del st.session_state.ai_feedback_error
 
+    # バックグラウンドのプロフィール更新が完了していれば結果を通知
+    # （実行中なら待たずに残しておき、以降の再実行で確認する）
+    refine_future = st.session_state.get("profile_refine_future")
+    if refine_future is not None and refine_future.done():
+        del st.session_state.profile_refine_future
+        try:
+            _, refine_error = refine_future.result()
+        except Exception as e:
+            # プロファイル更新のエラーはユーザー体験を阻害しないようログのみ（または無視）
+            print(f"Profile update error: {e}")
+        else:
+            if not refine_error:
+                st.toast("性格プロフィールが詳細化されました！", icon="✨")
+
 
 def render_journal_history(user_id: str) -> None:
     """ジャーナル履歴表示"""
@@ -453,7 +491,7 @@ def render_journal_history(user_id: str) -> None:
             
             # 削除ボタン
             if st.button("🗑️ 削除", key=f"del_{entry.id}"):
-                if delete_journal_entry(entry.id):
+                if delete_journal_entry(entry.id, entry.user_id):
                     st.success("エントリーを削除しました")
                     st.rerun()
                 else:
@@ -474,18 +512,3 @@ def render_emotion_chart(entries: list[JournalEntry]) -> None:
     df = pd.DataFrame(data)
 
     st.line_chart(df.set_index("日付"))
-
-
-
-def get_emotion_emoji(score: int) -> str:
-    """感情スコアに対応する絵文字を取得"""
-    if score >= 9:
-        return "🎉"
-    elif score >= 7:
-        return "😃"
-    elif score >= 5:
-        return "🙂"
-    elif score >= 3:
-        return "😐"
-    else:
-        return "😔"
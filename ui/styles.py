@@ -4,12 +4,14 @@
 モダンでプレミアムなデザインを実現するためのCSSスタイルを提供します。
 """
 
+from functools import lru_cache
+from typing import Final
+
 import streamlit as st
 
 
-def inject_custom_css() -> None:
-    """グローバルカスタムCSSを注入"""
-    st.markdown("""
+# グローバルカスタムCSS（インポート時に1回だけ組み立てる）
+_CUSTOM_CSS: Final[str] = """
     <style>
     /* ========================================
        カラーパレット（CSS変数）
@@ -379,9 +381,20 @@ def inject_custom_css() -> None:
     }
     
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+
+def inject_custom_css() -> None:
+    """グローバルカスタムCSSを注入
+
+    Streamlitは再実行で出力されなかった要素をDOMから取り除くため、
+    セッションで1回だけ注入するとスタイルが消えてしまう。
+    CSS文字列はモジュール定数として共有し、注入自体は毎回行う。
+    """
+    st.markdown(_CUSTOM_CSS, unsafe_allow_html=True)
 
 
+@lru_cache(maxsize=32)
 def get_hero_card(title: str, subtitle: str, icon: str = "✨") -> str:
     """ヒーローカードのHTMLを返す"""
     return f"""
@@ -412,6 +425,7 @@ def get_hero_card(title: str, subtitle: str, icon: str = "✨") -> str:
     """
 
 
+@lru_cache(maxsize=32)
 def get_feature_card(icon: str, title: str, description: str) -> str:
     """フィーチャーカードのHTMLを返す"""
     return f"""
@@ -621,3 +635,12 @@ def get_info_banner(icon: str, title: str, message: str, color: str = "#4facfe")
         </div>
     </div>
     """
+
+
+# 感情スコア（0-10）を添字とする絵文字
+_EMOTION_EMOJI: tuple[str, ...] = ("😔", "😔", "😔", "😐", "😐", "🙂", "🙂", "😃", "😃", "🎉", "🎉")
+
+
+def get_emotion_emoji(score: int) -> str:
+    """感情スコアに対応する絵文字を取得"""
+    return _EMOTION_EMOJI[min(max(score, 0), 10)]